@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tenant',
+            name='speech_backend',
+            field=models.CharField(choices=[('google', 'Google Speech-to-Text'), ('local', 'Local (CPU)')], default='google', max_length=20),
+        ),
+    ]
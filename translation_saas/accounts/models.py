@@ -22,6 +22,13 @@ class Tenant(models.Model):
     max_meetings = models.IntegerField(default=10)
     max_duration = models.IntegerField(default=60)  # em minutos
     
+    # Reconhecimento de voz: 'local' mantém o áudio nos nossos servidores
+    SPEECH_BACKEND_CHOICES = (
+        ('google', 'Google Speech-to-Text'),
+        ('local', 'Local (CPU)'),
+    )
+    speech_backend = models.CharField(max_length=20, choices=SPEECH_BACKEND_CHOICES, default='google')
+    
     def __str__(self):
         return self.name
 
@@ -0,0 +1,82 @@
+"""
+Benchmark dos formatos de saída do áudio sintetizado.
+
+Para cada formato/bitrate negociável, transcodifica um segmento sintético
+de fala (PCM s16le mono 16 kHz) e reporta:
+  * bytes enviados por ouvinte por segundo de áudio (egress);
+  * CPU de transcodificação por segmento (ffmpeg, tempo de usuário+sistema).
+
+Uso (a partir do diretório do projeto):
+    python -m benchmarks.bench_audio_formats [--seconds 4] [--runs 5]
+"""
+import argparse
+import math
+import random
+import resource
+import statistics
+import struct
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from translation_service.audio_formats import (  # noqa: E402
+    AUDIO_FORMATS, PCM_SAMPLE_RATE, AudioFormat, transcode, transcoder_available,
+)
+
+
+def synthetic_speech(seconds, sample_rate=PCM_SAMPLE_RATE):
+    """
+    Gera um sinal parecido com voz: harmônicos com pitch variável
+    modulados por sílabas de ~200 ms, mais um pouco de ruído.
+    """
+    rng = random.Random(0)
+    samples = []
+    phase = 0.0
+    for n in range(int(seconds * sample_rate)):
+        t = n / sample_rate
+        pitch = 140 + 30 * math.sin(2 * math.pi * 0.7 * t)
+        phase += 2 * math.pi * pitch / sample_rate
+        envelope = max(0.0, math.sin(2 * math.pi * 2.5 * t)) ** 0.5
+        value = sum(math.sin(k * phase) / k for k in range(1, 6)) * envelope
+        value += rng.uniform(-0.02, 0.02)
+        samples.append(max(-32768, min(32767, int(value * 9000))))
+    return struct.pack(f'<{len(samples)}h', *samples)
+
+
+def children_cpu():
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--seconds', type=float, default=4.0,
+                        help='duração do segmento sintético')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    pcm = synthetic_speech(args.seconds)
+    formats = [AudioFormat('pcm', None)]
+    if transcoder_available():
+        for name, spec in AUDIO_FORMATS.items():
+            formats += [AudioFormat(name, bitrate) for bitrate in spec['bitrates']]
+    else:
+        print('ffmpeg não encontrado: apenas PCM será medido\n')
+
+    print(f'segmento de {args.seconds:.1f} s, {args.runs} execuções por formato\n')
+    print(f'{"formato":<12} {"KB/s ouvinte":>13} {"vs PCM":>8} {"CPU/segmento":>14} {"CPU/s áudio":>12}')
+    for audio_format in formats:
+        cpu_samples = []
+        for _ in range(args.runs):
+            before = children_cpu()
+            encoded = transcode(pcm, audio_format)
+            cpu_samples.append(children_cpu() - before)
+        cpu = statistics.median(cpu_samples)
+        rate = len(encoded) / args.seconds
+        print(f'{audio_format.key:<12} {rate / 1024:13.1f} {rate / (len(pcm) / args.seconds):7.1%} '
+              f'{cpu * 1000:11.1f} ms {cpu / args.seconds * 1000:9.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
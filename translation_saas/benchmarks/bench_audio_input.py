@@ -0,0 +1,65 @@
+"""
+Benchmark da normalização do áudio recebido (downmix, reamostragem, int16).
+
+Para formatos típicos de captura do navegador, processa áudio em chunks
+do tamanho enviado pelo cliente e reporta o tempo de CPU por segundo de
+áudio, para dimensionar quantos falantes um worker suporta.
+
+Uso (a partir do diretório do projeto):
+    python -m benchmarks.bench_audio_input [--seconds 30] [--chunk-ms 20 100]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from translation_service.audio_input import AudioNormalizer  # noqa: E402
+
+CONFIGS = (
+    (48000, 2, 'f32le'),
+    (48000, 1, 'f32le'),
+    (44100, 2, 's16le'),
+    (44100, 1, 'f32le'),
+    (16000, 1, 's16le'),
+)
+
+
+def capture(seconds, sample_rate, channels, sample_format):
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    signal = 0.3 * np.sin(2 * np.pi * 220 * t) + 0.05 * rng.standard_normal(len(t))
+    frames = np.repeat(signal[:, None], channels, axis=1)
+    if sample_format == 's16le':
+        return (frames * 32767).astype('<i2').tobytes()
+    return frames.astype('<f4').tobytes()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--seconds', type=float, default=30.0)
+    parser.add_argument('--chunk-ms', type=int, nargs='+', default=[20, 100])
+    args = parser.parse_args()
+
+    print(f'{"entrada":<22} {"chunk":>7} {"CPU/s áudio":>12} {"falantes/núcleo":>16} {"bytes in/out":>13}')
+    for sample_rate, channels, sample_format in CONFIGS:
+        data = capture(args.seconds, sample_rate, channels, sample_format)
+        frame_bytes = channels * (2 if sample_format == 's16le' else 4)
+        for chunk_ms in args.chunk_ms:
+            chunk = frame_bytes * sample_rate * chunk_ms // 1000
+            normalizer = AudioNormalizer(sample_rate, channels, sample_format)
+            output = 0
+            start = time.process_time()
+            for i in range(0, len(data), chunk):
+                output += len(normalizer.process(data[i:i + chunk]))
+            cpu = (time.process_time() - start) / args.seconds
+            label = f'{sample_rate} Hz {channels}ch {sample_format}'
+            print(f'{label:<22} {chunk_ms:>5}ms {cpu * 1000:9.3f} ms '
+                  f'{1 / cpu if cpu else float("inf"):16.0f} {len(data) / max(output, 1):12.1f}x')
+
+
+if __name__ == '__main__':
+    main()
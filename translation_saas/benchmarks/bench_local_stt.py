@@ -0,0 +1,98 @@
+"""
+Benchmark do reconhecimento de voz local (pool de processos + batching).
+
+Simula N falantes concorrentes enviando janelas de áudio o mais rápido
+possível e reporta:
+  * fator de tempo real (RTF) por núcleo: tempo de CPU do pool / áudio;
+  * falantes sustentáveis por núcleo (1 / RTF);
+  * tamanho médio dos lotes formados.
+
+Sem --audio, usa o modelo de teste embutido com áudio gerado por ele
+(mede o overhead do pipeline). Para um modelo real, passe --model com um
+Whisper em formato CTranslate2 e --audio com um WAV 16 kHz mono s16le.
+
+Uso (a partir do diretório do projeto):
+    python -m benchmarks.bench_local_stt [--speakers 16] [--workers 4]
+"""
+import argparse
+import os
+import sys
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'translation_saas.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from translation_service.local_speech import (  # noqa: E402
+    BUNDLED_MODEL, CTCModel, LocalSpeechEngine,
+)
+
+
+def load_window(args):
+    if args.audio:
+        with wave.open(args.audio, 'rb') as wav:
+            if wav.getframerate() != 16000 or wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+                raise SystemExit('--audio deve ser WAV 16 kHz mono s16le')
+            return wav.readframes(wav.getnframes())
+    return CTCModel(BUNDLED_MODEL).render('the quick brown fox jumps over the lazy dog')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--model', default=BUNDLED_MODEL)
+    parser.add_argument('--audio', help='WAV 16 kHz mono usado como janela de cada falante')
+    parser.add_argument('--speakers', type=int, default=16)
+    parser.add_argument('--windows', type=int, default=10, help='janelas por falante')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--max-batch', type=int, default=8)
+    args = parser.parse_args()
+
+    window = load_window(args)
+    window_seconds = len(window) / 32000
+    engine = LocalSpeechEngine(model=args.model, workers=args.workers, max_batch=args.max_batch)
+    # Aquece o pool (spawn + carga do modelo) fora da medição
+    engine.transcribe(window)
+
+    def speaker(_):
+        for _ in range(args.windows):
+            engine.transcribe(window)
+
+    batches_before, windows_before = engine.batches, engine.windows
+    cpu_before = os.times()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.speakers) as executor:
+        list(executor.map(speaker, range(args.speakers)))
+    wall = time.perf_counter() - start
+    cpu_after = os.times()
+    engine.shutdown()
+
+    audio_seconds = args.speakers * args.windows * window_seconds
+    # Tempo de CPU dos processos do pool, contabilizado quando o shutdown os
+    # encerra; inclui a inicialização (spawn + carga do modelo), então o RTF
+    # é um limite superior, mais preciso quanto maior a carga medida
+    os_after = os.times()
+    pool_cpu = (os_after.children_user + os_after.children_system) - \
+        (cpu_before.children_user + cpu_before.children_system)
+    parent_cpu = (cpu_after.user + cpu_after.system) - (cpu_before.user + cpu_before.system)
+    rtf = pool_cpu / audio_seconds
+    batches = engine.batches - batches_before
+
+    print(f'modelo: {args.model}')
+    print(f'{args.speakers} falantes x {args.windows} janelas de {window_seconds:.2f} s, {args.workers} processos')
+    print(f'áudio processado:       {audio_seconds:10.1f} s em {wall:.2f} s de parede '
+          f'({audio_seconds / wall:.1f}x tempo real)')
+    print(f'CPU do pool:            {pool_cpu:10.2f} s (processo pai: {parent_cpu:.2f} s)')
+    print(f'RTF por núcleo:         {rtf:10.4f}')
+    print(f'falantes por núcleo:    {1 / rtf if rtf else float("inf"):10.1f}')
+    print(f'lote médio:             {(engine.windows - windows_before) / batches:10.1f} janelas')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark de inicialização do worker ASGI.
+
+Mede, em processos novos (cold start):
+  * o tempo até ``translation_saas.asgi.application`` estar pronto para
+    aceitar conexões;
+  * o tempo de import de cada SDK de provedor, que agora fica fora desse
+    caminho e só é pago no primeiro uso (ou no pre-warm em background).
+
+Uso (a partir do diretório do projeto):
+    python -m benchmarks.bench_startup [--runs N] [--importtime]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+ASGI_SNIPPET = """
+import time
+t0 = time.perf_counter()
+from translation_saas.asgi import application
+print(time.perf_counter() - t0)
+"""
+
+MODULE_SNIPPET = """
+import time
+t0 = time.perf_counter()
+import {module}
+print(time.perf_counter() - t0)
+"""
+
+
+def run_snippet(code, extra_args=()):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE='translation_saas.settings')
+    env.pop('TRANSLATION_PREWARM_PROVIDERS', None)
+    result = subprocess.run(
+        [sys.executable, *extra_args, '-c', code],
+        cwd=PROJECT_DIR, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return float(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def measure(code, runs):
+    samples = [run_snippet(code)[0] for _ in range(runs)]
+    return statistics.median(samples), max(samples)
+
+
+def report(label, code, runs):
+    try:
+        median, worst = measure(code, runs)
+        print(f'{label:<40} mediana {median * 1000:8.1f} ms   pior {worst * 1000:8.1f} ms')
+    except RuntimeError as e:
+        print(f'{label:<40} falhou: {e}')
+
+
+def main():
+    from translation_service.providers import PROVIDER_MODULES
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--importtime', action='store_true',
+                        help='imprime os 20 imports mais lentos do asgi (-X importtime)')
+    args = parser.parse_args()
+
+    report('cold start translation_saas.asgi', ASGI_SNIPPET, args.runs)
+    for module in PROVIDER_MODULES:
+        report(f'import {module}', MODULE_SNIPPET.format(module=module), args.runs)
+
+    if args.importtime:
+        _, stderr = run_snippet(ASGI_SNIPPET, ('-X', 'importtime'))
+        rows = []
+        for line in stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            _, cumulative_us, name = line.split(':', 1)[1].split('|')
+            rows.append((int(cumulative_us), name.strip()))
+        print('\nImports mais lentos (cumulativo):')
+        for cumulative_us, name in sorted(rows, reverse=True)[:20]:
+            print(f'{cumulative_us / 1000:8.1f} ms  {name}')
+
+
+if __name__ == '__main__':
+    sys.path.insert(0, str(PROJECT_DIR))
+    main()
@@ -0,0 +1,205 @@
+# core/archive.py
+import gzip
+import hashlib
+import io
+import json
+import mmap
+import os
+import tempfile
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+from .conf import app_config
+
+DEFAULT_CONFIG = {
+    'ROOT': os.path.join(settings.BASE_DIR, 'archive'),
+    # 'zstd' requer o pacote zstandard; sem ele os arquivos saem em gzip
+    'COMPRESSION': 'zstd',
+    'LEVEL': 10,
+}
+
+
+def get_config():
+    return app_config('MEETING_ARCHIVE', DEFAULT_CONFIG)
+
+
+class ArchiveCorrupted(Exception):
+    """
+    Arquivo frio diferente do registrado no manifesto (sha256).
+    """
+
+
+def _compression(requested):
+    if requested == 'zstd':
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            return 'gzip'
+    return requested
+
+
+def segment_to_dict(segment, translations):
+    return {
+        'id': segment.id,
+        'participant_id': segment.participant_id,
+        'original_text': segment.original_text,
+        'source_language': segment.source_language,
+        'duration': segment.duration,
+        'timestamp': segment.timestamp.isoformat(),
+        'translations': [
+            {
+                'id': translation.id,
+                'target_language': translation.target_language,
+                'translated_text': translation.translated_text,
+            }
+            for translation in translations
+        ],
+    }
+
+
+def _open_writer(raw, compression, level):
+    if compression == 'zstd':
+        import zstandard
+
+        return zstandard.ZstdCompressor(level=level).stream_writer(raw, closefd=False)
+    return gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=min(level, 9))
+
+
+def write_archive(meeting, batch_size=500):
+    """
+    Grava os segmentos da reunião em um arquivo JSONL comprimido.
+
+    Returns:
+        (caminho relativo, compressão, nº de transcrições, nº de traduções)
+    """
+    from .models import TranscriptionSegment
+
+    config = get_config()
+    compression = _compression(config['COMPRESSION'])
+    extension = 'zst' if compression == 'zstd' else 'gz'
+    relative_path = os.path.join(str(meeting.tenant_id), f'{meeting.id}.jsonl.{extension}')
+    path = os.path.join(config['ROOT'], relative_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    segments = (
+        TranscriptionSegment.objects
+        .filter(meeting=meeting)
+        .order_by('timestamp', 'id')
+        .prefetch_related('translations')
+    )
+    transcription_count = translation_count = 0
+
+    # Escrita atômica: o arquivo final só aparece completo
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, 'wb') as raw:
+            writer = _open_writer(raw, compression, config['LEVEL'])
+            with writer:
+                for segment in segments.iterator(chunk_size=batch_size):
+                    translations = list(segment.translations.all())
+                    line = json.dumps(segment_to_dict(segment, translations), ensure_ascii=False)
+                    writer.write(line.encode('utf-8') + b'\n')
+                    transcription_count += 1
+                    translation_count += len(translations)
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+    return relative_path, compression, transcription_count, translation_count
+
+
+def purge_segments(meeting, batch_size=500, pause=0):
+    """
+    Remove das tabelas quentes os segmentos já arquivados, em lotes.
+    """
+    from .models import TranscriptionSegment
+
+    deleted = 0
+    while True:
+        ids = list(
+            TranscriptionSegment.objects
+            .filter(meeting=meeting)
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        # As traduções são removidas em cascata
+        TranscriptionSegment.objects.filter(id__in=ids).delete()
+        deleted += len(ids)
+        if pause:
+            time.sleep(pause)
+
+
+def archive_meeting(meeting, batch_size=500, pause=0):
+    """
+    Arquiva os segmentos de uma reunião encerrada e os remove do banco.
+
+    O manifesto é criado antes da remoção, então as leituras passam para o
+    arquivo assim que ele está completo. Se o processo for interrompido no
+    meio da remoção, rodar de novo apenas termina a limpeza.
+    """
+    from .models import MeetingArchive
+
+    archive = MeetingArchive.objects.filter(meeting=meeting).first()
+    if archive is None:
+        relative_path, compression, transcriptions, translations = write_archive(meeting, batch_size)
+        path = os.path.join(get_config()['ROOT'], relative_path)
+        with transaction.atomic():
+            archive = MeetingArchive.objects.create(
+                meeting=meeting,
+                path=relative_path,
+                compression=compression,
+                transcription_count=transcriptions,
+                translation_count=translations,
+                size=os.path.getsize(path),
+                sha256=_file_sha256(path),
+            )
+
+    purge_segments(meeting, batch_size, pause)
+    return archive
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _verify(archive, data, path):
+    if hashlib.sha256(data).hexdigest() != archive.sha256:
+        raise ArchiveCorrupted(f'{path}: sha256 não confere com o manifesto da reunião {archive.meeting_id}')
+
+
+def read_archive(archive):
+    """
+    Lê os segmentos de um arquivo via mmap, na ordem em que foram gravados.
+
+    O sha256 do arquivo é conferido com o manifesto antes da leitura;
+    divergências levantam ArchiveCorrupted.
+
+    Yields:
+        Dicionários no formato de segment_to_dict
+    """
+    path = os.path.join(get_config()['ROOT'], archive.path)
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            _verify(archive, b'', path)
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            _verify(archive, mapped, path)
+            if archive.compression == 'zstd':
+                import zstandard
+
+                stream = zstandard.ZstdDecompressor().stream_reader(mapped)
+            else:
+                stream = gzip.GzipFile(fileobj=mapped, mode='rb')
+            with io.TextIOWrapper(stream, encoding='utf-8') as lines:
+                for line in lines:
+                    yield json.loads(line)
@@ -0,0 +1,28 @@
+# core/conf.py
+import copy
+
+from django.conf import settings
+
+
+def merge_config(defaults, overrides):
+    """
+    Combina as configurações padrão com as sobrescritas, recursivamente.
+
+    Dicionários aninhados são combinados chave a chave (ex: sobrescrever um
+    provedor em TRANSLATION_SCHEDULER['PROVIDERS'] mantém os demais); os
+    outros valores são substituídos. Os padrões não são modificados.
+    """
+    config = copy.deepcopy(defaults)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(config.get(key), dict):
+            config[key] = merge_config(config[key], value)
+        else:
+            config[key] = copy.deepcopy(value)
+    return config
+
+
+def app_config(name, defaults):
+    """
+    Retorna o bloco `name` do settings combinado com os padrões do módulo.
+    """
+    return merge_config(defaults, getattr(settings, name, None) or {})
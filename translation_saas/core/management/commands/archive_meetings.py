@@ -0,0 +1,54 @@
+# core/management/commands/archive_meetings.py
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.archive import archive_meeting
+from core.models import Meeting
+
+
+class Command(BaseCommand):
+    help = (
+        'Move os segmentos de reuniões encerradas há mais de N dias para '
+        'arquivos comprimidos. Pensado para rodar em background: processa '
+        'em lotes com pausas para não competir com as inserções ao vivo.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30,
+                            help='Arquivar reuniões encerradas há mais de N dias (padrão: 30)')
+        parser.add_argument('--limit', type=int, default=None,
+                            help='Máximo de reuniões por execução')
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Segmentos lidos/removidos por lote (padrão: 500)')
+        parser.add_argument('--pause', type=float, default=0.1,
+                            help='Pausa em segundos entre lotes de remoção (padrão: 0.1)')
+        parser.add_argument('--meeting-pause', type=float, default=1.0,
+                            help='Pausa em segundos entre reuniões (padrão: 1.0)')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        # Inclui reuniões já arquivadas com segmentos restantes (execução
+        # anterior interrompida no meio da remoção)
+        meetings = (
+            Meeting.objects
+            .filter(is_active=False, end_time__lt=cutoff, transcriptions__isnull=False)
+            .distinct()
+            .order_by('end_time')
+        )
+        if options['limit']:
+            meetings = meetings[:options['limit']]
+
+        archived = 0
+        for meeting in meetings:
+            archive = archive_meeting(meeting, options['batch_size'], options['pause'])
+            archived += 1
+            self.stdout.write(
+                f'{meeting.id}: {archive.transcription_count} transcrições, '
+                f'{archive.translation_count} traduções, {archive.size} bytes ({archive.compression})'
+            )
+            time.sleep(options['meeting_pause'])
+
+        self.stdout.write(self.style.SUCCESS(f'{archived} reuniões arquivadas.'))
@@ -0,0 +1,36 @@
+# core/management/commands/rebuild_meeting_stats.py
+from django.core.management.base import BaseCommand
+
+from core.models import Meeting
+from core.stats import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula do zero as estatísticas (MeetingStats) a partir dos segmentos. '
+        'Reuniões ativas são ignoradas: os workers ainda podem ter deltas '
+        'pendentes, que seriam contados duas vezes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('meeting_ids', nargs='*', type=int,
+                            help='IDs das reuniões (padrão: todas)')
+        parser.add_argument('--include-active', action='store_true',
+                            help='Recalcular também reuniões ativas (ex: após a queda do '
+                                 'worker que as hospedava, sem deltas pendentes)')
+
+    def handle(self, *args, **options):
+        meetings = Meeting.objects.order_by('id')
+        if options['meeting_ids']:
+            meetings = meetings.filter(id__in=options['meeting_ids'])
+        if not options['include_active']:
+            skipped = meetings.filter(is_active=True).count()
+            meetings = meetings.filter(is_active=False)
+            if skipped:
+                self.stdout.write(f'{skipped} reuniões ativas ignoradas.')
+
+        total = 0
+        for meeting_id in meetings.values_list('id', flat=True).iterator():
+            rebuild(meeting_id)
+            total += 1
+        self.stdout.write(self.style.SUCCESS(f'Estatísticas recalculadas para {total} reuniões.'))
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transcriptionsegment',
+            name='duration',
+            field=models.FloatField(default=0),
+        ),
+        migrations.CreateModel(
+            name='MeetingStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('transcription_count', models.IntegerField(default=0)),
+                ('translation_count', models.IntegerField(default=0)),
+                ('translated_characters', models.BigIntegerField(default=0)),
+                ('talk_time', models.JSONField(default=dict)),
+                ('segments_by_language', models.JSONField(default=dict)),
+                ('translations_by_language', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('meeting', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='core.meeting')),
+            ],
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_meeting_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MeetingArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=500)),
+                ('compression', models.CharField(choices=[('zstd', 'Zstandard'), ('gzip', 'Gzip')], max_length=10)),
+                ('transcription_count', models.IntegerField(default=0)),
+                ('translation_count', models.IntegerField(default=0)),
+                ('size', models.BigIntegerField(default=0)),
+                ('sha256', models.CharField(max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('meeting', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='archive', to='core.meeting')),
+            ],
+        ),
+    ]
@@ -41,6 +41,7 @@ class TranscriptionSegment(models.Model):
     participant = models.ForeignKey(Participant, on_delete=models.CASCADE, related_name='transcriptions')
     original_text = models.TextField()
     source_language = models.CharField(max_length=10)
+    duration = models.FloatField(default=0)  # segundos de fala
     timestamp = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
@@ -52,4 +53,49 @@ class TranslationSegment(models.Model):
     translated_text = models.TextField()
     
     def __str__(self):
-        return f"{self.transcription.participant} - {self.target_language}"
\ No newline at end of file
+        return f"{self.transcription.participant} - {self.target_language}"
+
+class MeetingStats(models.Model):
+    """
+    Agregados da reunião mantidos incrementalmente (ver core/stats.py).
+
+    Dashboards e cobrança leem esta única linha em vez de agregar as tabelas
+    de segmentos. Pode ser reconstruída com `manage.py rebuild_meeting_stats`.
+    """
+    meeting = models.OneToOneField(Meeting, on_delete=models.CASCADE, related_name='stats')
+    transcription_count = models.IntegerField(default=0)
+    translation_count = models.IntegerField(default=0)
+    translated_characters = models.BigIntegerField(default=0)  # volume para cobrança
+    
+    talk_time = models.JSONField(default=dict)  # {participant_id: segundos}
+    segments_by_language = models.JSONField(default=dict)  # {idioma: transcrições}
+    translations_by_language = models.JSONField(default=dict)  # {idioma: caracteres}
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.meeting} - stats"
+
+class MeetingArchive(models.Model):
+    """
+    Manifesto dos segmentos de uma reunião movidos para arquivo frio.
+    
+    Os segmentos saem das tabelas quentes e passam a ser lidos do arquivo
+    JSONL comprimido indicado em `path` (ver core/archive.py).
+    """
+    COMPRESSION_CHOICES = (
+        ('zstd', 'Zstandard'),
+        ('gzip', 'Gzip'),
+    )
+    
+    meeting = models.OneToOneField(Meeting, on_delete=models.CASCADE, related_name='archive')
+    path = models.CharField(max_length=500)
+    compression = models.CharField(max_length=10, choices=COMPRESSION_CHOICES)
+    transcription_count = models.IntegerField(default=0)
+    translation_count = models.IntegerField(default=0)
+    size = models.BigIntegerField(default=0)  # em bytes, comprimido
+    sha256 = models.CharField(max_length=64)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.meeting} - archive"
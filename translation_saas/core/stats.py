@@ -0,0 +1,237 @@
+# core/stats.py
+import asyncio
+import logging
+from collections import Counter, defaultdict
+
+from django.db import transaction
+
+from .conf import app_config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG = {
+    # Intervalo (s) entre gravações dos deltas acumulados
+    'FLUSH_INTERVAL': 5,
+    # Número de eventos pendentes que força uma gravação antecipada
+    'MAX_PENDING': 500,
+}
+
+
+def get_config():
+    return app_config('MEETING_STATS', DEFAULT_CONFIG)
+
+
+class StatsDelta:
+    """
+    Incrementos pendentes de uma reunião.
+    """
+
+    def __init__(self):
+        self.events = 0
+        self.transcription_count = 0
+        self.translation_count = 0
+        self.translated_characters = 0
+        self.talk_time = Counter()
+        self.segments_by_language = Counter()
+        self.translations_by_language = Counter()
+
+    def merge(self, other):
+        self.events += other.events
+        self.transcription_count += other.transcription_count
+        self.translation_count += other.translation_count
+        self.translated_characters += other.translated_characters
+        self.talk_time.update(other.talk_time)
+        self.segments_by_language.update(other.segments_by_language)
+        self.translations_by_language.update(other.translations_by_language)
+
+
+def _add(mapping, delta):
+    for key, value in delta.items():
+        mapping[key] = mapping.get(key, 0) + value
+
+
+def apply_delta(meeting_id, delta):
+    """
+    Aplica os incrementos acumulados à linha MeetingStats da reunião.
+    """
+    from .models import MeetingStats
+
+    with transaction.atomic():
+        stats, _ = MeetingStats.objects.select_for_update().get_or_create(meeting_id=meeting_id)
+        stats.transcription_count += delta.transcription_count
+        stats.translation_count += delta.translation_count
+        stats.translated_characters += delta.translated_characters
+        _add(stats.talk_time, delta.talk_time)
+        _add(stats.segments_by_language, delta.segments_by_language)
+        _add(stats.translations_by_language, delta.translations_by_language)
+        stats.save()
+
+
+def _aggregate_database(meeting_id):
+    from django.db.models import Count, Sum
+    from django.db.models.functions import Length
+
+    from .models import TranscriptionSegment, TranslationSegment
+
+    transcriptions = TranscriptionSegment.objects.filter(meeting_id=meeting_id)
+    translations = TranslationSegment.objects.filter(transcription__meeting_id=meeting_id)
+
+    talk_time = {
+        str(row['participant_id']): row['total']
+        for row in transcriptions.values('participant_id').annotate(total=Sum('duration'))
+    }
+    segments_by_language = {
+        row['source_language']: row['total']
+        for row in transcriptions.values('source_language').annotate(total=Count('id'))
+    }
+    translations_by_language = {
+        row['target_language']: row['total'] or 0
+        for row in translations.values('target_language').annotate(total=Sum(Length('translated_text')))
+    }
+    return translations.count(), talk_time, segments_by_language, translations_by_language
+
+
+def _aggregate_archive(archive):
+    from .archive import read_archive
+
+    translation_count = 0
+    talk_time = Counter()
+    segments_by_language = Counter()
+    translations_by_language = Counter()
+    for segment in read_archive(archive):
+        talk_time[str(segment['participant_id'])] += segment['duration']
+        segments_by_language[segment['source_language']] += 1
+        for translation in segment['translations']:
+            translation_count += 1
+            translations_by_language[translation['target_language']] += len(translation['translated_text'])
+    return translation_count, dict(talk_time), dict(segments_by_language), dict(translations_by_language)
+
+
+def rebuild(meeting_id):
+    """
+    Recalcula do zero a linha MeetingStats da reunião a partir dos segmentos.
+
+    Reuniões arquivadas são lidas do arquivo frio, já que seus segmentos
+    foram removidos do banco (ver core/archive.py).
+
+    Só deve rodar para reuniões encerradas ou já gravadas com flush: deltas
+    ainda pendentes no MeetingStatsBuffer de um worker seriam somados por
+    cima do valor recalculado, contando os mesmos segmentos duas vezes.
+    """
+    from .models import MeetingArchive, MeetingStats
+
+    archive = MeetingArchive.objects.filter(meeting_id=meeting_id).first()
+    if archive is not None:
+        aggregates = _aggregate_archive(archive)
+    else:
+        aggregates = _aggregate_database(meeting_id)
+    translation_count, talk_time, segments_by_language, translations_by_language = aggregates
+
+    with transaction.atomic():
+        stats, _ = MeetingStats.objects.select_for_update().get_or_create(meeting_id=meeting_id)
+        stats.transcription_count = sum(segments_by_language.values())
+        stats.translation_count = translation_count
+        stats.translated_characters = sum(translations_by_language.values())
+        stats.talk_time = talk_time
+        stats.segments_by_language = segments_by_language
+        stats.translations_by_language = translations_by_language
+        stats.save()
+    return stats
+
+
+class MeetingStatsBuffer:
+    """
+    Acumula em memória os incrementos das estatísticas e grava em lote.
+
+    O consumer registra cada segmento salvo; os deltas são somados por
+    reunião e gravados a cada FLUSH_INTERVAL (ou ao atingir MAX_PENDING),
+    com uma única atualização por reunião. Deltas não gravados em caso de
+    queda do worker podem ser recuperados com `rebuild_meeting_stats`
+    (reuniões que ficaram ativas exigem --include-active).
+    """
+
+    def __init__(self, flush_interval=None, max_pending=None):
+        config = get_config()
+        self.flush_interval = flush_interval or config['FLUSH_INTERVAL']
+        self.max_pending = max_pending or config['MAX_PENDING']
+        self.pending = defaultdict(StatsDelta)
+        self.pending_events = 0
+        self._flush_task = None
+
+    def record_transcription(self, meeting_id, participant_id, language, duration):
+        delta = self.pending[meeting_id]
+        delta.events += 1
+        delta.transcription_count += 1
+        delta.talk_time[str(participant_id)] += duration
+        delta.segments_by_language[language] += 1
+        self._recorded()
+
+    def record_translation(self, meeting_id, language, characters):
+        delta = self.pending[meeting_id]
+        delta.events += 1
+        delta.translation_count += 1
+        delta.translated_characters += characters
+        delta.translations_by_language[language] += characters
+        self._recorded()
+
+    def _recorded(self):
+        self.pending_events += 1
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.ensure_future(self._flush_loop())
+        elif self.pending_events >= self.max_pending:
+            asyncio.ensure_future(self._flush_quietly())
+
+    async def _flush_loop(self):
+        while self.pending:
+            await asyncio.sleep(self.flush_interval)
+            await self._flush_quietly()
+
+    async def _flush_quietly(self):
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception('Falha ao gravar estatísticas de reuniões')
+
+    async def flush(self, meeting_id=None):
+        """
+        Grava os deltas pendentes (de todas as reuniões ou só de uma).
+        """
+        from asgiref.sync import sync_to_async
+
+        if meeting_id is None:
+            batch, self.pending = self.pending, defaultdict(StatsDelta)
+            self.pending_events = 0
+        elif meeting_id in self.pending:
+            batch = {meeting_id: self.pending.pop(meeting_id)}
+            self.pending_events -= batch[meeting_id].events
+        else:
+            return
+
+        try:
+            await sync_to_async(self._apply_batch)(batch)
+        except Exception:
+            # Banco indisponível: devolve os deltas para a próxima tentativa
+            for pending_id, delta in batch.items():
+                self.pending[pending_id].merge(delta)
+                self.pending_events += delta.events
+            raise
+
+    def _apply_batch(self, batch):
+        # Remove do lote o que já foi gravado, para não contar duas vezes
+        # se uma reunião posterior falhar
+        for meeting_id, delta in list(batch.items()):
+            apply_delta(meeting_id, delta)
+            del batch[meeting_id]
+
+
+_buffer = None
+
+
+def get_stats_buffer():
+    """
+    Retorna o acumulador de estatísticas do processo.
+    """
+    global _buffer
+    if _buffer is None:
+        _buffer = MeetingStatsBuffer()
+    return _buffer
@@ -1,3 +1,233 @@
-from django.test import TestCase
+import os
+import tempfile
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from accounts.models import Tenant, User
+
+from . import archive, stats
+from .archive import ArchiveCorrupted, archive_meeting
+from .conf import app_config, merge_config
+from .models import Meeting, MeetingArchive, MeetingStats, Participant, TranscriptionSegment, TranslationSegment
+from .stats import MeetingStatsBuffer, StatsDelta, apply_delta, rebuild
+from .transcripts import export_transcript, iter_transcript
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class ConfTests(SimpleTestCase):
+    def test_merge_config_is_recursive(self):
+        defaults = {'A': 1, 'NESTED': {'x': {'rate': 1, 'burst': 2}, 'y': {'rate': 3}}}
+        merged = merge_config(defaults, {'A': 2, 'NESTED': {'x': {'rate': 5}}})
+        self.assertEqual(merged, {'A': 2, 'NESTED': {'x': {'rate': 5, 'burst': 2}, 'y': {'rate': 3}}})
+        self.assertEqual(defaults['NESTED']['x']['rate'], 1)
+
+    @override_settings(MEETING_STATS={'MAX_PENDING': 10})
+    def test_app_config_reads_settings(self):
+        self.assertEqual(app_config('MEETING_STATS', {'MAX_PENDING': 1, 'FLUSH_INTERVAL': 5}),
+                         {'MAX_PENDING': 10, 'FLUSH_INTERVAL': 5})
+        self.assertEqual(app_config('MISSING_BLOCK', {'A': 1}), {'A': 1})
+
+
+class MeetingTestCase(TestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name='Acme', subdomain='acme')
+        self.user = User.objects.create(username='host', tenant=self.tenant)
+        self.meeting = self.create_meeting()
+        self.participant = Participant.objects.create(meeting=self.meeting, name='Ana')
+
+    def create_meeting(self, **kwargs):
+        return Meeting.objects.create(tenant=self.tenant, creator=self.user, name='Daily', **kwargs)
+
+    def create_segment(self, text, duration, translations=(), meeting=None):
+        segment = TranscriptionSegment.objects.create(
+            meeting=meeting or self.meeting,
+            participant=self.participant,
+            original_text=text,
+            source_language='en',
+            duration=duration,
+        )
+        for language, translated_text in translations:
+            TranslationSegment.objects.create(
+                transcription=segment, target_language=language, translated_text=translated_text
+            )
+        return segment
+
+
+class ApplyDeltaTests(MeetingTestCase):
+    def test_accumulates_into_single_row(self):
+        delta = StatsDelta()
+        delta.transcription_count = 2
+        delta.translation_count = 1
+        delta.translated_characters = 4
+        delta.talk_time['7'] = 1.5
+        delta.segments_by_language['en'] = 2
+        delta.translations_by_language['pt'] = 4
+
+        apply_delta(self.meeting.id, delta)
+        apply_delta(self.meeting.id, delta)
+
+        row = MeetingStats.objects.get(meeting=self.meeting)
+        self.assertEqual(row.transcription_count, 4)
+        self.assertEqual(row.translation_count, 2)
+        self.assertEqual(row.translated_characters, 8)
+        self.assertEqual(row.talk_time, {'7': 3.0})
+        self.assertEqual(row.segments_by_language, {'en': 4})
+        self.assertEqual(row.translations_by_language, {'pt': 8})
+
+
+class MeetingStatsBufferTests(MeetingTestCase):
+    async def test_flush_writes_one_update_per_meeting(self):
+        other = await Meeting.objects.acreate(tenant=self.tenant, creator=self.user, name='Retro')
+        buffer = MeetingStatsBuffer(flush_interval=60, max_pending=100)
+        for _ in range(3):
+            buffer.record_transcription(self.meeting.id, self.participant.id, 'en', 2.0)
+            buffer.record_translation(self.meeting.id, 'pt', 5)
+        buffer.record_transcription(other.id, self.participant.id, 'en', 1.0)
+        self.assertEqual(buffer.pending_events, 7)
+
+        with mock.patch.object(stats, 'apply_delta', wraps=apply_delta) as applied:
+            await buffer.flush(self.meeting.id)
+            self.assertEqual(applied.call_count, 1)
+            self.assertEqual(buffer.pending_events, 1)
+
+            await buffer.flush()
+            self.assertEqual(applied.call_count, 2)
+            self.assertEqual(buffer.pending_events, 0)
+        buffer._flush_task.cancel()
+
+        row = await MeetingStats.objects.aget(meeting=self.meeting)
+        self.assertEqual(row.transcription_count, 3)
+        self.assertEqual(row.translation_count, 3)
+        self.assertEqual(row.translated_characters, 15)
+        self.assertEqual(row.talk_time, {str(self.participant.id): 6.0})
+
+    async def test_failed_flush_keeps_pending_deltas(self):
+        buffer = MeetingStatsBuffer(flush_interval=60, max_pending=100)
+        buffer.record_transcription(self.meeting.id, self.participant.id, 'en', 2.0)
+
+        with mock.patch.object(stats, 'apply_delta', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                await buffer.flush(self.meeting.id)
+        self.assertEqual(buffer.pending_events, 1)
+        self.assertEqual(buffer.pending[self.meeting.id].transcription_count, 1)
+
+        await buffer.flush()
+        buffer._flush_task.cancel()
+        row = await MeetingStats.objects.aget(meeting=self.meeting)
+        self.assertEqual(row.transcription_count, 1)
+
+
+class RebuildTests(MeetingTestCase):
+    def test_rebuild_recomputes_from_segments(self):
+        self.create_segment('hello', 1.5, [('pt', 'olá'), ('es', 'hola')])
+        self.create_segment('bye', 0.5, [('pt', 'tchau')])
+        MeetingStats.objects.create(meeting=self.meeting, transcription_count=99, talk_time={'x': 1})
+
+        row = rebuild(self.meeting.id)
+
+        self.assertEqual(row.transcription_count, 2)
+        self.assertEqual(row.translation_count, 3)
+        self.assertEqual(row.translated_characters, 12)
+        self.assertEqual(row.talk_time, {str(self.participant.id): 2.0})
+        self.assertEqual(row.segments_by_language, {'en': 2})
+        self.assertEqual(row.translations_by_language, {'pt': 8, 'es': 4})
+
+    def test_rebuild_after_archive_reads_archive(self):
+        self.create_segment('hello', 1.5, [('pt', 'olá'), ('es', 'hola')])
+        self.create_segment('bye', 0.5, [('pt', 'tchau')])
+        expected = rebuild(self.meeting.id)
+
+        with tempfile.TemporaryDirectory() as root:
+            with override_settings(MEETING_ARCHIVE={'ROOT': root, 'COMPRESSION': 'gzip', 'LEVEL': 1}):
+                archive_meeting(self.meeting)
+                self.assertFalse(TranscriptionSegment.objects.filter(meeting=self.meeting).exists())
+                row = rebuild(self.meeting.id)
+
+        for field in ('transcription_count', 'translation_count', 'translated_characters',
+                      'talk_time', 'segments_by_language', 'translations_by_language'):
+            self.assertEqual(getattr(row, field), getattr(expected, field), field)
+
+    def test_command_skips_active_meetings(self):
+        self.create_segment('hello', 1.0)
+        ended = self.create_meeting(is_active=False)
+        self.create_segment('bye', 1.0, meeting=ended)
+
+        call_command('rebuild_meeting_stats', stdout=StringIO())
+        self.assertFalse(MeetingStats.objects.filter(meeting=self.meeting).exists())
+        self.assertEqual(MeetingStats.objects.get(meeting=ended).transcription_count, 1)
+
+        call_command('rebuild_meeting_stats', '--include-active', stdout=StringIO())
+        self.assertEqual(MeetingStats.objects.get(meeting=self.meeting).transcription_count, 1)
+
+
+class ArchiveTests(MeetingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.root.cleanup)
+        self.create_segment('hello', 1.5, [('pt', 'olá'), ('es', 'hola')])
+        self.create_segment('how are you', 2.0, [('pt', 'como vai')])
+        self.create_segment('bye', 0.5)
+
+    def archive_settings(self, compression='gzip'):
+        return override_settings(
+            MEETING_ARCHIVE={'ROOT': self.root.name, 'COMPRESSION': compression, 'LEVEL': 3}
+        )
+
+    def assert_round_trip(self, compression):
+        before = (export_transcript(self.meeting), export_transcript(self.meeting, 'pt'),
+                  list(iter_transcript(self.meeting)))
+        with self.archive_settings(compression):
+            manifest = archive_meeting(self.meeting)
+            self.assertFalse(TranscriptionSegment.objects.filter(meeting=self.meeting).exists())
+            after = (export_transcript(self.meeting), export_transcript(self.meeting, 'pt'),
+                     list(iter_transcript(self.meeting)))
+        self.assertEqual(manifest.compression, compression)
+        self.assertEqual((manifest.transcription_count, manifest.translation_count), (3, 3))
+        self.assertEqual(after, before)
+        self.assertIn('Ana: como vai', before[1])
+
+    def test_export_is_identical_after_gzip_archive(self):
+        self.assert_round_trip('gzip')
+
+    @skipUnless(zstandard, 'zstandard não instalado')
+    def test_export_is_identical_after_zstd_archive(self):
+        self.assert_round_trip('zstd')
+
+    def test_rerun_finishes_interrupted_purge(self):
+        before = export_transcript(self.meeting)
+        purge = archive.purge_segments
+
+        def interrupted(meeting, batch_size, pause):
+            purge(meeting, batch_size=1, pause=0)
+            raise KeyboardInterrupt
+
+        with self.archive_settings():
+            with mock.patch.object(archive, 'purge_segments', side_effect=interrupted):
+                with self.assertRaises(KeyboardInterrupt):
+                    archive_meeting(self.meeting)
+            # Manifesto já criado: as leituras vêm do arquivo, mesmo com
+            # segmentos ainda no banco
+            self.assertTrue(MeetingArchive.objects.filter(meeting=self.meeting).exists())
+            self.assertEqual(export_transcript(self.meeting), before)
+
+            with mock.patch.object(archive, 'write_archive') as write:
+                archive_meeting(self.meeting)
+            write.assert_not_called()
+            self.assertFalse(TranscriptionSegment.objects.filter(meeting=self.meeting).exists())
+            self.assertEqual(export_transcript(self.meeting), before)
+
+    def test_read_rejects_modified_archive(self):
+        with self.archive_settings():
+            manifest = archive_meeting(self.meeting)
+            with open(os.path.join(self.root.name, manifest.path), 'ab') as f:
+                f.write(b'x')
+            with self.assertRaises(ArchiveCorrupted):
+                list(iter_transcript(self.meeting))
@@ -0,0 +1,48 @@
+# core/transcripts.py
+from .archive import read_archive, segment_to_dict
+from .models import MeetingArchive, Participant, TranscriptionSegment
+
+
+def iter_transcript(meeting, batch_size=500):
+    """
+    Percorre a transcrição da reunião, do banco ou do arquivo frio.
+
+    A origem é transparente para quem lê: os segmentos têm sempre o formato
+    de segment_to_dict, com as traduções embutidas.
+    """
+    archive = MeetingArchive.objects.filter(meeting=meeting).first()
+    if archive is not None:
+        yield from read_archive(archive)
+        return
+
+    segments = (
+        TranscriptionSegment.objects
+        .filter(meeting=meeting)
+        .order_by('timestamp', 'id')
+        .prefetch_related('translations')
+    )
+    for segment in segments.iterator(chunk_size=batch_size):
+        yield segment_to_dict(segment, segment.translations.all())
+
+
+def export_transcript(meeting, language=None):
+    """
+    Exporta a transcrição como texto, uma fala por linha.
+
+    Args:
+        meeting: Reunião a exportar
+        language: Idioma da tradução (opcional; padrão é o texto original)
+
+    Returns:
+        Transcrição em texto
+    """
+    names = dict(Participant.objects.filter(meeting=meeting).values_list('id', 'name'))
+    lines = []
+    for segment in iter_transcript(meeting):
+        text = segment['original_text']
+        if language and language != segment['source_language']:
+            translated = [t for t in segment['translations'] if t['target_language'] == language]
+            if translated:
+                text = translated[0]['translated_text']
+        lines.append(f"[{segment['timestamp']}] {names.get(segment['participant_id'], 'Anonymous')}: {text}")
+    return '\n'.join(lines)
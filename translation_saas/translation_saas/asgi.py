@@ -3,6 +3,11 @@ ASGI config for translation_saas project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+HTTP is served by Django; WebSocket connections under ``ws/meetings/<id>/``
+are routed to ``TranslationConsumer``. Provider SDKs are not imported here:
+set ``TRANSLATION_PREWARM_PROVIDERS=1`` to load them in a background thread
+once the worker is already accepting connections.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -13,4 +18,22 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'translation_saas.settings')
 
-application = get_asgi_application()
+# Initialize Django before importing anything that touches models.
+django_asgi_app = get_asgi_application()
+
+from channels.auth import AuthMiddlewareStack  # noqa: E402
+from channels.routing import ProtocolTypeRouter, URLRouter  # noqa: E402
+from channels.security.websocket import AllowedHostsOriginValidator  # noqa: E402
+
+from translation_service import providers  # noqa: E402
+from translation_service.routing import websocket_urlpatterns  # noqa: E402
+
+application = ProtocolTypeRouter({
+    'http': django_asgi_app,
+    'websocket': AllowedHostsOriginValidator(
+        AuthMiddlewareStack(URLRouter(websocket_urlpatterns))
+    ),
+})
+
+if os.environ.get('TRANSLATION_PREWARM_PROVIDERS') == '1':
+    providers.prewarm()
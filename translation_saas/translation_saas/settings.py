@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -37,8 +38,14 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'channels',
+    'accounts',
+    'core',
+    'translation_service',
 ]
 
+AUTH_USER_MODEL = 'accounts.User'
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -68,6 +75,17 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'translation_saas.wsgi.application'
 
+ASGI_APPLICATION = 'translation_saas.asgi.application'
+
+CHANNEL_LAYERS = {
+    'default': {
+        'BACKEND': 'channels_redis.core.RedisChannelLayer',
+        'CONFIG': {
+            'hosts': [(os.environ.get('REDIS_HOST', 'localhost'), 6379)],
+        },
+    },
+}
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -120,3 +138,75 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Escalonador de chamadas aos provedores (translation_service/scheduler.py)
+
+TRANSLATION_SCHEDULER = {
+    'SYNC_INTERVAL': 5,
+    'PROVIDERS': {
+        'speech': {'rate': 50, 'burst': 100, 'concurrency': 16},
+        'translate': {'rate': 100, 'burst': 200, 'concurrency': 8},
+        'polly': {'rate': 80, 'burst': 160, 'concurrency': 8},
+        'local_speech': {'rate': 1000, 'burst': 1000, 'concurrency': 16},
+    },
+}
+
+# Fila de saída por conexão WebSocket (translation_service/outbound.py)
+
+OUTBOUND_QUEUE = {
+    'HIGH_WATER': 64,
+    'MAX_SIZE': 256,
+    'REPORT_INTERVAL': 60,
+}
+
+# Armazenamento dos áudios sintetizados fora do channel layer
+# (translation_service/blob_store.py). Precisa ser compartilhado por todos os
+# workers: o padrão é o mesmo Redis do channel layer. 'filesystem' só serve
+# para um único nó ou um diretório montado em todos (ex: NFS), com
+# AUDIO_BLOB_LOCATION apontando para ele.
+
+AUDIO_BLOB_STORE = {
+    'BACKEND': os.environ.get('AUDIO_BLOB_BACKEND', 'redis'),
+    'LOCATION': os.environ.get(
+        'AUDIO_BLOB_LOCATION', f"redis://{os.environ.get('REDIS_HOST', 'localhost')}:6379/1"
+    ),
+    'TTL': 300,
+    'CACHE_BYTES': 64 * 1024 * 1024,
+}
+
+# Estatísticas de reuniões mantidas incrementalmente (core/stats.py)
+
+MEETING_STATS = {
+    'FLUSH_INTERVAL': 5,
+    'MAX_PENDING': 500,
+}
+
+# Arquivo frio dos segmentos de reuniões encerradas (core/archive.py)
+
+MEETING_ARCHIVE = {
+    'ROOT': os.environ.get('MEETING_ARCHIVE_DIR', str(BASE_DIR / 'archive')),
+    'COMPRESSION': 'zstd',
+    'LEVEL': 10,
+}
+
+# Reconhecimento de voz local em CPU (translation_service/local_speech.py).
+# MODEL aponta para um modelo Whisper no formato CTranslate2 e é obrigatório
+# para tenants com speech_backend='local'. Cada processo carrega sua própria
+# cópia dos pesos do Whisper: prefira poucos WORKERS com mais threads.
+
+LOCAL_SPEECH = {
+    'MODEL': os.environ.get('LOCAL_SPEECH_MODEL'),
+    'WORKERS': None,
+    'THREADS_PER_WORKER': 1,
+    'MAX_BATCH': 8,
+    'MAX_WAIT': 0.02,
+    'TIMEOUT': 30,
+}
+
+# Profiler por amostragem sob demanda (manage.py profile_meeting)
+
+PROFILER = {
+    'OUTPUT_DIR': os.environ.get('PROFILER_OUTPUT_DIR', '/tmp/translation_saas_profiles'),
+    'MAX_DURATION': 300,
+}
@@ -1,6 +1,19 @@
+import logging
+
 from django.apps import AppConfig
 
+logger = logging.getLogger(__name__)
+
 
 class TranslationServiceConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'translation_service'
+
+    def ready(self):
+        from .audio_formats import transcoder_available
+
+        if not transcoder_available():
+            logger.warning(
+                'ffmpeg não encontrado no PATH: o áudio sintetizado será enviado '
+                'aos ouvintes apenas em PCM'
+            )
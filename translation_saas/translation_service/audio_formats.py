@@ -0,0 +1,188 @@
+# translation_service/audio_formats.py
+import asyncio
+import functools
+import shutil
+import subprocess
+from collections import OrderedDict, namedtuple
+
+# Formato canônico produzido pela síntese (Polly PCM): s16le mono 16 kHz
+PCM_SAMPLE_RATE = 16000
+
+# Formatos oferecidos aos ouvintes na negociação do 'config'
+AUDIO_FORMATS = {
+    'pcm': {
+        # audio/L16 (RFC 2586) é big-endian; o PCM do Polly é little-endian
+        'mime_type': 'audio/pcm; rate=16000; channels=1; encoding=s16le',
+        'bitrates': (),
+        'default_bitrate': None,
+    },
+    'mp3': {
+        'codec': 'libmp3lame',
+        'container': 'mp3',
+        'mime_type': 'audio/mpeg',
+        'bitrates': (32, 48, 64, 96, 128),
+        'default_bitrate': 64,
+    },
+    'opus': {
+        'codec': 'libopus',
+        'container': 'ogg',
+        'mime_type': 'audio/ogg; codecs=opus',
+        'bitrates': (16, 24, 32, 48, 64),
+        'default_bitrate': 24,
+    },
+    'webm': {
+        'codec': 'libopus',
+        'container': 'webm',
+        'mime_type': 'audio/webm; codecs=opus',
+        'bitrates': (16, 24, 32, 48, 64),
+        'default_bitrate': 24,
+    },
+}
+
+DEFAULT_FORMAT = 'mp3'
+
+
+class AudioTranscodeError(Exception):
+    """
+    Falha ao transcodificar áudio sintetizado.
+    """
+
+
+class AudioFormat(namedtuple('AudioFormat', ['name', 'bitrate'])):
+    """
+    Formato de saída negociado por um ouvinte.
+    """
+
+    @property
+    def key(self):
+        return f'{self.name}@{self.bitrate}' if self.bitrate else self.name
+
+    @property
+    def mime_type(self):
+        return AUDIO_FORMATS[self.name]['mime_type']
+
+    def describe(self):
+        return {
+            'format': self.name,
+            'bitrate': self.bitrate,
+            'mime_type': self.mime_type,
+            'sample_rate': PCM_SAMPLE_RATE,
+        }
+
+
+@functools.lru_cache(maxsize=None)
+def transcoder_available():
+    return shutil.which('ffmpeg') is not None
+
+
+def negotiate(requested=None, bitrate=None):
+    """
+    Escolhe o formato de saída a partir do pedido do cliente.
+
+    Formatos desconhecidos caem no padrão e bitrates fora da lista são
+    arredondados para o mais próximo oferecido. Sem ffmpeg no servidor,
+    apenas PCM pode ser servido.
+
+    Args:
+        requested: Nome do formato ('opus', 'webm', 'mp3' ou 'pcm')
+        bitrate: Bitrate desejado em kbps (opcional)
+
+    Returns:
+        AudioFormat
+    """
+    name = requested if requested in AUDIO_FORMATS else DEFAULT_FORMAT
+    if name != 'pcm' and not transcoder_available():
+        name = 'pcm'
+
+    spec = AUDIO_FORMATS[name]
+    if not spec['bitrates']:
+        return AudioFormat(name, None)
+
+    try:
+        bitrate = int(bitrate)
+    except (TypeError, ValueError):
+        bitrate = spec['default_bitrate']
+    bitrate = min(spec['bitrates'], key=lambda offered: abs(offered - bitrate))
+    return AudioFormat(name, bitrate)
+
+
+def transcode(pcm, audio_format, sample_rate=PCM_SAMPLE_RATE):
+    """
+    Transcodifica PCM s16le mono para o formato pedido usando ffmpeg.
+
+    Args:
+        pcm: Áudio PCM em bytes
+        audio_format: AudioFormat de destino
+        sample_rate: Taxa de amostragem do PCM em Hz
+
+    Returns:
+        Áudio codificado como bytes
+    """
+    if audio_format.name == 'pcm':
+        return pcm
+
+    spec = AUDIO_FORMATS[audio_format.name]
+    command = [
+        'ffmpeg', '-hide_banner', '-loglevel', 'error',
+        '-f', 's16le', '-ar', str(sample_rate), '-ac', '1', '-i', 'pipe:0',
+        '-c:a', spec['codec'], '-b:a', f'{audio_format.bitrate}k',
+    ]
+    if spec['codec'] == 'libopus':
+        # Perfil otimizado para voz
+        command += ['-application', 'voip']
+    command += ['-f', spec['container'], 'pipe:1']
+
+    result = subprocess.run(command, input=pcm, capture_output=True)
+    if result.returncode != 0:
+        raise AudioTranscodeError(result.stderr.decode(errors='replace').strip())
+    return result.stdout
+
+
+class TranscodeCache:
+    """
+    Cache por processo dos áudios transcodificados.
+
+    Cada (áudio, formato) é transcodificado uma única vez no worker, mesmo
+    com vários ouvintes pedindo o mesmo formato ao mesmo tempo: os pedidos
+    concorrentes aguardam a mesma future. O áudio é identificado pelo hash
+    do conteúdo, então o mesmo segmento/idioma nunca é reprocessado.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    async def get(self, audio_key, audio_format, load_pcm):
+        """
+        Args:
+            audio_key: Hash do PCM canônico
+            audio_format: AudioFormat de destino
+            load_pcm: Função sem argumentos que retorna uma corrotina com o
+                PCM; só é chamada se o formato ainda não estiver em cache
+        """
+        if audio_format.name == 'pcm':
+            return await load_pcm()
+
+        key = (audio_key, audio_format.key)
+        future = self.entries.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._transcode(load_pcm, audio_format))
+            self.entries[key] = future
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        else:
+            self.entries.move_to_end(key)
+
+        try:
+            return await asyncio.shield(future)
+        except Exception:
+            self.entries.pop(key, None)
+            raise
+
+    async def _transcode(self, load_pcm, audio_format):
+        pcm = await load_pcm()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, transcode, pcm, audio_format)
+
+
+transcode_cache = TranscodeCache()
@@ -0,0 +1,121 @@
+# translation_service/audio_input.py
+import numpy as np
+
+# Formato esperado pelo reconhecimento: LINEAR16 (s16le) mono 16 kHz
+TARGET_SAMPLE_RATE = 16000
+
+# Formatos de amostra aceitos no 'config': dtype e fator de escala para [-1, 1)
+SAMPLE_FORMATS = {
+    's16le': ('<i2', 1 / 32768),
+    's32le': ('<i4', 1 / 2147483648),
+    'f32le': ('<f4', 1.0),
+}
+
+
+class AudioFormatError(ValueError):
+    """
+    Formato de áudio declarado pelo cliente não suportado.
+    """
+
+
+def lowpass_filter(taps, cutoff):
+    """
+    FIR passa-baixa (sinc janelado com Hamming).
+
+    Args:
+        taps: Número de coeficientes (ímpar)
+        cutoff: Frequência de corte normalizada (fração da taxa de amostragem)
+    """
+    n = np.arange(taps) - (taps - 1) / 2
+    kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(taps)
+    return (kernel / kernel.sum()).astype(np.float32)
+
+
+class AudioNormalizer:
+    """
+    Converte o áudio do cliente para PCM s16le mono 16 kHz.
+
+    Recebe os chunks na taxa, canais e formato declarados no 'config' e faz
+    downmix, filtro anti-aliasing, reamostragem (interpolação linear) e
+    conversão para int16 de forma vetorizada. O estado entre chunks (bytes
+    de amostra incompleta, histórico do filtro e fase da reamostragem) é
+    mantido, então o resultado independe de como o áudio foi fatiado.
+    """
+
+    def __init__(self, sample_rate=TARGET_SAMPLE_RATE, channels=1, sample_format='s16le',
+                 target_rate=TARGET_SAMPLE_RATE, taps=63):
+        if sample_format not in SAMPLE_FORMATS:
+            raise AudioFormatError(f'Formato de amostra não suportado: {sample_format}')
+        try:
+            sample_rate = int(sample_rate)
+            channels = int(channels)
+        except (TypeError, ValueError):
+            raise AudioFormatError('sample_rate e channels devem ser inteiros')
+        if not 8000 <= sample_rate <= 192000 or not 1 <= channels <= 8:
+            raise AudioFormatError(f'Parâmetros de áudio inválidos: {sample_rate} Hz, {channels} canais')
+
+        dtype, self.scale = SAMPLE_FORMATS[sample_format]
+        self.dtype = np.dtype(dtype)
+        self.channels = channels
+        self.frame_bytes = self.dtype.itemsize * channels
+        self.passthrough = (
+            sample_format == 's16le' and channels == 1 and sample_rate == target_rate
+        )
+        self.step = sample_rate / target_rate
+        self.remainder = b''
+
+        # Anti-aliasing só é necessário ao reduzir a taxa
+        self.filter = lowpass_filter(taps, 0.45 / self.step) if self.step > 1 else None
+        self.history = np.zeros(taps - 1, dtype=np.float32)
+        self.tail = np.zeros(0, dtype=np.float32)
+        self.position = 0.0
+
+    def process(self, data):
+        """
+        Normaliza um chunk de áudio.
+
+        Returns:
+            PCM s16le mono na taxa alvo (pode ser vazio se o chunk for curto)
+        """
+        if self.passthrough:
+            return data
+
+        data = self.remainder + data
+        usable = len(data) - len(data) % self.frame_bytes
+        self.remainder = data[usable:]
+        if not usable:
+            return b''
+
+        samples = np.frombuffer(data, dtype=self.dtype, count=usable // self.dtype.itemsize)
+        samples = samples.astype(np.float32) * self.scale
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels).mean(axis=1)
+
+        if self.step != 1:
+            samples = self._resample(samples)
+
+        return (np.clip(samples, -1.0, 32767 / 32768) * 32768).astype('<i2').tobytes()
+
+    def _resample(self, samples):
+        if self.filter is not None:
+            extended = np.concatenate([self.history, samples])
+            self.history = extended[len(extended) - len(self.history):]
+            samples = np.convolve(extended, self.filter, mode='valid')
+
+        # A última amostra do chunk anterior fica no início do buffer para
+        # interpolar através da fronteira entre chunks
+        buffer = np.concatenate([self.tail, samples])
+        last = len(buffer) - 1
+        if last < 1 or self.position >= last:
+            self.tail = buffer
+            return np.zeros(0, dtype=np.float32)
+
+        count = int(np.ceil((last - self.position) / self.step))
+        positions = self.position + np.arange(count) * self.step
+        index = positions.astype(np.int64)
+        fraction = (positions - index).astype(np.float32)
+        output = buffer[index] * (1 - fraction) + buffer[index + 1] * fraction
+
+        self.position = self.position + count * self.step - last
+        self.tail = buffer[last:]
+        return output
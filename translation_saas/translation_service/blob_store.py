@@ -0,0 +1,197 @@
+# translation_service/blob_store.py
+import asyncio
+import hashlib
+import os
+import tempfile
+import time
+from collections import OrderedDict
+
+from core.conf import app_config
+
+DEFAULT_CONFIG = {
+    # 'redis' ou 'filesystem'; o diretório local só serve para um único nó
+    # (desenvolvimento), em produção o armazenamento precisa ser compartilhado
+    'BACKEND': 'filesystem',
+    'LOCATION': os.path.join(tempfile.gettempdir(), 'translation_saas_audio'),
+    # Tempo de vida dos blobs em segundos
+    'TTL': 300,
+    # Tamanho máximo do cache em memória de cada nó
+    'CACHE_BYTES': 64 * 1024 * 1024,
+}
+
+
+def get_config():
+    return app_config('AUDIO_BLOB_STORE', DEFAULT_CONFIG)
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class BlobNotFound(Exception):
+    """
+    Blob expirado ou inexistente no armazenamento.
+    """
+
+
+class FileSystemBlobStore:
+    """
+    Armazena blobs como arquivos nomeados pelo hash do conteúdo.
+
+    A escrita é atômica (arquivo temporário + rename), então leitores nunca
+    veem um blob parcial. Blobs mais antigos que o TTL
+    são removidos periodicamente durante as escritas.
+    """
+
+    def __init__(self, location, ttl):
+        self.location = location
+        self.ttl = ttl
+        self.last_eviction = 0
+        os.makedirs(location, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.location, key[:2], key)
+
+    def put(self, data):
+        key = content_hash(data)
+        path = self._path(key)
+        if os.path.exists(path):
+            # Conteúdo idêntico já armazenado: só renova o TTL
+            os.utime(path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        if time.time() - self.last_eviction > self.ttl / 2:
+            self.evict_expired()
+        return key
+
+    def get(self, key):
+        # Leitura simples: o blob inteiro vai para o cache em memória e para
+        # o socket, então mapeá-lo não evitaria a cópia
+        try:
+            with open(self._path(key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            raise BlobNotFound(key)
+
+    def evict_expired(self):
+        self.last_eviction = time.time()
+        cutoff = self.last_eviction - self.ttl
+        for root, _, files in os.walk(self.location):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if os.stat(path).st_mtime < cutoff:
+                        os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+
+class RedisBlobStore:
+    """
+    Armazena blobs no Redis com expiração nativa (SET EX).
+    """
+
+    def __init__(self, location, ttl):
+        import redis
+
+        self.client = redis.Redis.from_url(location)
+        self.ttl = ttl
+
+    def put(self, data):
+        key = content_hash(data)
+        # NX: conteúdo idêntico não é reenviado; só renovamos o TTL
+        if not self.client.set(f'audio:{key}', data, ex=self.ttl, nx=True):
+            self.client.expire(f'audio:{key}', self.ttl)
+        return key
+
+    def get(self, key):
+        data = self.client.get(f'audio:{key}')
+        if data is None:
+            raise BlobNotFound(key)
+        return data
+
+
+class BlobCache:
+    """
+    Cache LRU por nó, limitado em bytes, na frente do armazenamento.
+
+    Leituras concorrentes do mesmo blob aguardam uma única busca, então cada
+    nó busca o blob uma vez, não importa quantos ouvintes locais precisem dele.
+    As entradas expiram junto com o TTL do armazenamento, para o nó não
+    servir um blob que os demais já não encontram.
+    """
+
+    def __init__(self, store, max_bytes, ttl=None):
+        self.store = store
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self.entries = OrderedDict()
+        self.pending = {}
+
+    async def put(self, data):
+        loop = asyncio.get_running_loop()
+        key = await loop.run_in_executor(None, self.store.put, data)
+        self._remember(key, data)
+        return key
+
+    async def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            expires, data = entry
+            if expires is None or expires > time.monotonic():
+                self.entries.move_to_end(key)
+                return data
+            self._forget(key)
+
+        future = self.pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(None, self.store.get, key)
+            self.pending[key] = future
+            future.add_done_callback(lambda _: self.pending.pop(key, None))
+        data = await asyncio.shield(future)
+        self._remember(key, data)
+        return data
+
+    def _remember(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        # put() renova o TTL no armazenamento; a entrada local acompanha
+        self._forget(key)
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        self.entries[key] = (expires, data)
+        self.size += len(data)
+        while self.size > self.max_bytes:
+            _, (_, evicted) = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def _forget(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[1])
+
+
+BACKENDS = {
+    'filesystem': FileSystemBlobStore,
+    'redis': RedisBlobStore,
+}
+
+_blob_cache = None
+
+
+def get_blob_cache():
+    """
+    Retorna o cache de blobs de áudio do processo.
+    """
+    global _blob_cache
+    if _blob_cache is None:
+        config = get_config()
+        store = BACKENDS[config['BACKEND']](config['LOCATION'], config['TTL'])
+        _blob_cache = BlobCache(store, config['CACHE_BYTES'], config['TTL'])
+    return _blob_cache
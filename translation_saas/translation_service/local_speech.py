@@ -0,0 +1,338 @@
+# translation_service/local_speech.py
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.core.exceptions import ImproperlyConfigured
+
+from core.conf import app_config
+
+# Modelo de teste: reconhece apenas tons sintéticos. Usado pelos testes e
+# benchmarks, nunca como padrão em produção.
+BUNDLED_MODEL = os.path.join(os.path.dirname(__file__), 'local_models', 'tiny-ctc')
+
+DEFAULT_CONFIG = {
+    # Diretório do modelo (obrigatório): formato CTC em .npy ou um modelo
+    # Whisper no formato CTranslate2 (faster-whisper)
+    'MODEL': None,
+    # Processos de inferência (padrão: um por núcleo)
+    'WORKERS': None,
+    # Threads de CPU por processo (modelos Whisper)
+    'THREADS_PER_WORKER': 1,
+    # Janelas de áudio por chamada de inferência
+    'MAX_BATCH': 8,
+    # Espera máxima (s) para completar um lote antes de despachar
+    'MAX_WAIT': 0.02,
+    # Tempo máximo (s) de espera por uma transcrição
+    'TIMEOUT': 30,
+}
+
+
+def get_config():
+    return app_config('LOCAL_SPEECH', DEFAULT_CONFIG)
+
+
+class CTCModel:
+    """
+    Modelo acústico CTC linear sobre o espectro de magnitude.
+
+    Os pesos ficam em .npy e são abertos com mmap, então todos os processos
+    do pool compartilham as mesmas páginas do page cache em vez de cada um
+    carregar uma cópia. A inferência é vetorizada sobre o lote inteiro.
+    """
+
+    def __init__(self, path):
+        import numpy as np
+
+        with open(os.path.join(path, 'config.json')) as f:
+            config = json.load(f)
+        with open(os.path.join(path, 'vocab.json')) as f:
+            self.vocab = json.load(f)
+        self.sample_rate = config['sample_rate']
+        self.frequencies = config['frequencies']
+        self.frame = config['frame']
+        self.hop = config['hop']
+        self.weights = np.load(os.path.join(path, 'weights.npy'), mmap_mode='r')
+        self.bias = np.load(os.path.join(path, 'bias.npy'), mmap_mode='r')
+        self.window = np.hanning(self.frame).astype(np.float32)
+
+    def transcribe_batch(self, windows, language_code):
+        import numpy as np
+        from numpy.lib.stride_tricks import sliding_window_view
+
+        signals = [np.frombuffer(audio, dtype='<i2').astype(np.float32) / 32768 for audio in windows]
+        frame_counts = [max(0, (len(s) - self.frame) // self.hop + 1) for s in signals]
+        length = max(frame_counts, default=0)
+        if length == 0:
+            return ['' for _ in windows]
+
+        # Lote com zero-padding: (B, amostras) -> (B, T, frame)
+        padded = np.zeros((len(signals), (length - 1) * self.hop + self.frame), dtype=np.float32)
+        for i, signal in enumerate(signals):
+            usable = signal[:padded.shape[1]]
+            padded[i, :len(usable)] = usable
+        frames = sliding_window_view(padded, self.frame, axis=1)[:, ::self.hop]
+
+        spectrum = np.abs(np.fft.rfft(frames * self.window, axis=-1))
+        spectrum /= spectrum.sum(axis=-1, keepdims=True) + 1e-9
+        tokens = np.argmax(spectrum @ self.weights + self.bias, axis=-1)
+
+        return [self._decode(tokens[i, :count]) for i, count in enumerate(frame_counts)]
+
+    def _decode(self, tokens):
+        # Decodificação gulosa CTC: colapsa repetições e remove o blank (0)
+        text = []
+        previous = 0
+        for token in tokens.tolist():
+            if token != previous and token != 0:
+                text.append(self.vocab[token])
+            previous = token
+        return ''.join(text).strip()
+
+    def render(self, text, token_duration=0.12, gap=0.04):
+        """
+        Gera PCM s16le cujo reconhecimento é `text`, um tom por caractere.
+
+        Usado nos testes e benchmarks do modelo embutido.
+        """
+        import numpy as np
+
+        tone_samples = int(token_duration * self.sample_rate)
+        silence = np.zeros(int(gap * self.sample_rate), dtype=np.float32)
+        t = np.arange(tone_samples) / self.sample_rate
+        parts = [silence]
+        for char in text:
+            frequency = self.frequencies[self.vocab.index(char)]
+            parts += [0.5 * np.sin(2 * np.pi * frequency * t).astype(np.float32), silence]
+        return (np.concatenate(parts) * 32767).astype('<i2').tobytes()
+
+
+class WhisperModel:
+    """
+    Modelo da família Whisper quantizado (int8) via faster-whisper.
+
+    As janelas do lote viram log-mels de 30 s com padding e passam juntas
+    pelo encoder e pelo decoder do CTranslate2 (encode + generate), uma
+    única chamada de inferência por lote. Janelas acima de 30 s são
+    truncadas; as do streaming têm poucos segundos.
+
+    Ao contrário do modelo CTC, o CTranslate2 carrega os pesos em memória
+    própria em cada processo (não há mmap compartilhado): para Whisper,
+    prefira poucos WORKERS com mais THREADS_PER_WORKER.
+    """
+
+    def __init__(self, path, threads):
+        from faster_whisper import WhisperModel as FasterWhisperModel
+
+        self.sample_rate = 16000
+        self.model = FasterWhisperModel(path, device='cpu', compute_type='int8', cpu_threads=threads)
+
+    def transcribe_batch(self, windows, language_code):
+        import numpy as np
+        from faster_whisper.audio import pad_or_trim
+        from faster_whisper.tokenizer import Tokenizer
+
+        multilingual = self.model.model.is_multilingual
+        language = language_code.split('-')[0] if language_code else 'en'
+        tokenizer = Tokenizer(
+            self.model.hf_tokenizer, multilingual,
+            task='transcribe', language=language if multilingual else None,
+        )
+
+        # (B, n_mels, 3000): a última coluna do extrator é descartada, como
+        # no BatchedInferencePipeline do faster-whisper
+        features = np.stack([
+            pad_or_trim(self.model.feature_extractor(
+                np.frombuffer(audio, dtype='<i2').astype(np.float32) / 32768
+            )[..., :-1])
+            for audio in windows
+        ])
+        prompt = list(tokenizer.sot_sequence) + [tokenizer.no_timestamps]
+        results = self.model.model.generate(
+            self.model.encode(features),
+            [prompt] * len(windows),
+            beam_size=1,
+            max_length=self.model.max_length,
+            suppress_blank=True,
+            suppress_tokens=[-1],
+        )
+        return [tokenizer.decode(result.sequences_ids[0]).strip() for result in results]
+
+
+def load_model(path, threads=1):
+    if os.path.exists(os.path.join(path, 'weights.npy')):
+        return CTCModel(path)
+    return WhisperModel(path, threads)
+
+
+# Estado de cada processo do pool
+_worker_model = None
+
+
+def _init_worker(path, threads):
+    global _worker_model
+    _worker_model = load_model(path, threads)
+
+
+def _infer_batch(windows, language_code, sample_rate):
+    if sample_rate != _worker_model.sample_rate:
+        raise ValueError(
+            f'Modelo local espera {_worker_model.sample_rate} Hz, recebeu {sample_rate} Hz'
+        )
+    return _worker_model.transcribe_batch(windows, language_code)
+
+
+class LocalSpeechEngine:
+    """
+    Reconhecimento de voz local em CPU servido por um pool de processos.
+
+    Chamadas concorrentes (de vários falantes, em várias threads) entram em
+    uma fila; uma thread de batching espera um processo livre e junta as
+    janelas pendentes do mesmo idioma em uma única chamada de inferência.
+    Quanto mais ocupado o pool, maiores os lotes.
+
+    Se um processo morre (ex: OOM ou modelo inválido), o pool é recriado e
+    as janelas afetadas falham com BrokenProcessPool; nenhuma chamada fica
+    presa esperando um resultado que não virá.
+    """
+
+    def __init__(self, model=None, workers=None, threads_per_worker=None,
+                 max_batch=None, max_wait=None, timeout=None):
+        config = get_config()
+        self.model = model or config['MODEL']
+        if not self.model:
+            raise ImproperlyConfigured(
+                "LOCAL_SPEECH['MODEL'] não definido: configure o diretório do modelo "
+                "de reconhecimento local (variável LOCAL_SPEECH_MODEL)"
+            )
+        self.workers = workers or config['WORKERS'] or os.cpu_count() or 1
+        self.max_batch = max_batch or config['MAX_BATCH']
+        self.max_wait = config['MAX_WAIT'] if max_wait is None else max_wait
+        self.timeout = timeout or config['TIMEOUT']
+        self.threads = threads_per_worker or config['THREADS_PER_WORKER']
+
+        self.pool_lock = threading.Lock()
+        self.pool = self._create_pool()
+        self.requests = queue.Queue()
+        self.free_workers = threading.BoundedSemaphore(self.workers)
+        self.batches = 0
+        self.windows = 0
+        self.batcher = threading.Thread(target=self._batch_loop, name='local-speech-batcher', daemon=True)
+        self.batcher.start()
+
+    def _create_pool(self):
+        # spawn: o processo pai tem threads e um event loop, fork não é seguro
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(self.model, self.threads),
+        )
+
+    def _replace_pool(self, broken):
+        with self.pool_lock:
+            if self.pool is not broken:
+                return
+            self.pool = self._create_pool()
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def transcribe(self, audio_content, language_code='en-US', sample_rate=16000):
+        """
+        Transcreve uma janela de áudio PCM s16le mono (bloqueante).
+
+        Raises:
+            TimeoutError: Sem resultado em TIMEOUT segundos
+        """
+        future = Future()
+        self.requests.put((audio_content, language_code, sample_rate, future))
+        return future.result(timeout=self.timeout)
+
+    def shutdown(self):
+        self.requests.put(None)
+        self.batcher.join()
+        self.pool.shutdown()
+
+    def _batch_loop(self):
+        while True:
+            self.free_workers.acquire()
+            first = self.requests.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                try:
+                    item = self.requests.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    self.requests.put(None)
+                    break
+                batch.append(item)
+            self._dispatch(batch)
+
+    def _dispatch(self, batch):
+        groups = defaultdict(list)
+        for audio, language_code, sample_rate, future in batch:
+            groups[(language_code, sample_rate)].append((audio, future))
+
+        for index, ((language_code, sample_rate), items) in enumerate(groups.items()):
+            # O primeiro grupo usa o processo já reservado pelo loop
+            if index > 0:
+                self.free_workers.acquire()
+            self.batches += 1
+            self.windows += len(items)
+            pool = self.pool
+            try:
+                result = pool.submit(
+                    _infer_batch, [audio for audio, _ in items], language_code, sample_rate
+                )
+            except Exception as e:
+                # Pool quebrado (ou encerrado): libera o processo reservado e
+                # falha o lote em vez de derrubar a thread de batching
+                self.free_workers.release()
+                self._fail(items, e)
+                if isinstance(e, BrokenProcessPool):
+                    self._replace_pool(pool)
+                continue
+            result.add_done_callback(
+                lambda result, items=items, pool=pool: self._resolve(result, items, pool)
+            )
+
+    def _resolve(self, result, items, pool):
+        self.free_workers.release()
+        try:
+            texts = result.result()
+        except Exception as e:
+            self._fail(items, e)
+            if isinstance(e, BrokenProcessPool):
+                self._replace_pool(pool)
+            return
+        for (_, future), text in zip(items, texts):
+            future.set_result(text)
+
+    def _fail(self, items, error):
+        for _, future in items:
+            if not future.done():
+                future.set_exception(error)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_local_engine():
+    """
+    Retorna o motor de reconhecimento local do processo.
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = LocalSpeechEngine()
+    return _engine
@@ -0,0 +1,47 @@
+# translation_service/management/commands/profile_meeting.py
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Meeting
+from translation_service.profiler import get_config
+
+
+class Command(BaseCommand):
+    help = (
+        'Liga o profiler por amostragem, por um tempo limitado, em todos os '
+        'workers que atendem a reunião. Cada worker grava um arquivo '
+        '.collapsed (flamegraph) e um .json com o atraso do event loop em '
+        'PROFILER["OUTPUT_DIR"]. Não requer reinício.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('meeting_id', type=int)
+        parser.add_argument('--duration', type=float, default=30,
+                            help='Duração da sessão em segundos (padrão: 30)')
+        parser.add_argument('--interval', type=float, default=0.005,
+                            help='Intervalo de amostragem em segundos (padrão: 0.005)')
+
+    def handle(self, *args, **options):
+        if not Meeting.objects.filter(id=options['meeting_id'], is_active=True).exists():
+            raise CommandError(f'Reunião {options["meeting_id"]} não existe ou não está ativa.')
+
+        config = get_config()
+        if options['duration'] > config['MAX_DURATION']:
+            raise CommandError(f'Duração máxima é {config["MAX_DURATION"]} segundos.')
+        if options['interval'] < 0.001:
+            raise CommandError('Intervalo mínimo é 0.001 segundo.')
+
+        async_to_sync(get_channel_layer().group_send)(
+            f'meeting_{options["meeting_id"]}',
+            {
+                'type': 'profiler_start',
+                'meeting_id': options['meeting_id'],
+                'duration': options['duration'],
+                'interval': options['interval'],
+            }
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Profiler solicitado por {options["duration"]:.0f} s; resultados em '
+            f'{config["OUTPUT_DIR"]} de cada worker da reunião.'
+        ))
@@ -0,0 +1,223 @@
+# translation_service/outbound.py
+import asyncio
+import json
+import logging
+import weakref
+from collections import deque
+
+from core.conf import app_config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG = {
+    # Acima desta profundidade a fila passa a descartar áudio e agrupar textos
+    'HIGH_WATER': 64,
+    # Profundidade máxima absoluta; acima dela o item descartável mais
+    # antigo (áudio ou texto agrupável) é descartado
+    'MAX_SIZE': 256,
+    # Intervalo (s) entre os logs das métricas agregadas; 0 desativa
+    'REPORT_INTERVAL': 60,
+}
+
+# Filas vivas no processo, para métricas agregadas
+_queues = weakref.WeakSet()
+_report_task = None
+
+
+def get_config():
+    return app_config('OUTBOUND_QUEUE', DEFAULT_CONFIG)
+
+
+class OutboundQueue:
+    """
+    Fila de saída limitada de uma conexão WebSocket.
+
+    Os handlers do channel layer apenas enfileiram mensagens e retornam; uma
+    task escritora dedicada drena a fila para o socket. Assim um ouvinte com
+    rede lenta atrasa só a própria fila, nunca o canal da reunião.
+
+    Acima de HIGH_WATER, áudios antigos são descartados primeiro e textos
+    novos são agrupados no último texto pendente com a mesma chave. Acima
+    de MAX_SIZE só áudios e textos com chave de agrupamento são descartados:
+    mensagens de controle (audio_format, error, meeting_ended) sempre chegam.
+    """
+
+    def __init__(self, send, high_water=None, max_size=None):
+        config = get_config()
+        self.send = send
+        self.high_water = high_water or config['HIGH_WATER']
+        self.max_size = max_size or config['MAX_SIZE']
+        self.items = deque()
+        self.ready = asyncio.Event()
+        self.writer = None
+        self.closed = False
+        self.sent = 0
+        self.dropped_audio = 0
+        self.dropped_text = 0
+        self.coalesced = 0
+        _queues.add(self)
+
+    def start(self):
+        self.writer = asyncio.ensure_future(self._write_loop())
+        _ensure_reporter()
+
+    async def close(self):
+        self.closed = True
+        if self.writer is not None:
+            self.writer.cancel()
+            try:
+                await self.writer
+            except asyncio.CancelledError:
+                pass
+        self.items.clear()
+
+    def put_text(self, payload, coalesce_key=None, text_field='text'):
+        """
+        Enfileira uma mensagem JSON.
+
+        Args:
+            payload: Dicionário a ser enviado como JSON
+            coalesce_key: Mensagens com a mesma chave podem ser agrupadas
+                quando a fila está acima do high-water mark
+            text_field: Campo do payload concatenado ao agrupar
+        """
+        if not self.closed and coalesce_key is not None and len(self.items) >= self.high_water:
+            for item in reversed(self.items):
+                if item[0] == 'text' and item[1] == coalesce_key:
+                    pending = item[2]
+                    pending[text_field] = f'{pending[text_field]} {payload[text_field]}'
+                    self.coalesced += 1
+                    return
+        self._put(('text', coalesce_key, payload))
+
+    def put_audio(self, data):
+        """
+        Enfileira um áudio sintetizado (bytes ou future que resolve em bytes).
+        """
+        self._put(('audio', None, data))
+
+    def _put(self, item):
+        if self.closed:
+            self._discard(item)
+            return
+        self.items.append(item)
+        if len(self.items) > self.high_water:
+            self._shed_audio()
+        if len(self.items) > self.max_size:
+            self._trim()
+        self.ready.set()
+
+    def _discard(self, item):
+        if item[0] == 'audio':
+            self.dropped_audio += 1
+            if not isinstance(item[2], bytes):
+                # Future descartada: evita aviso de exceção nunca recuperada
+                item[2].add_done_callback(lambda future: future.cancelled() or future.exception())
+        else:
+            self.dropped_text += 1
+
+    def _shed_audio(self):
+        # Descarta os áudios mais antigos até voltar ao high-water mark,
+        # preservando o mais recente para o ouvinte não ficar mudo
+        excess = len(self.items) - self.high_water
+        kept = deque()
+        last_audio = max(
+            (i for i, item in enumerate(self.items) if item[0] == 'audio'),
+            default=None
+        )
+        for i, item in enumerate(self.items):
+            if excess > 0 and item[0] == 'audio' and i != last_audio:
+                excess -= 1
+                self._discard(item)
+                continue
+            kept.append(item)
+        self.items = kept
+
+    def _trim(self):
+        # Descarta os itens descartáveis mais antigos até voltar a MAX_SIZE;
+        # mensagens de controle (sem chave de agrupamento) são mantidas
+        excess = len(self.items) - self.max_size
+        kept = deque()
+        for item in self.items:
+            if excess > 0 and (item[0] == 'audio' or item[1] is not None):
+                excess -= 1
+                self._discard(item)
+                continue
+            kept.append(item)
+        self.items = kept
+
+    async def _write_loop(self):
+        try:
+            await self._drain()
+        except Exception:
+            # Socket quebrado: a fila para de aceitar itens em vez de crescer
+            # até MAX_SIZE sem ninguém para drená-la
+            logger.exception('Falha ao enviar pelo WebSocket; fechando a fila de saída')
+            self.closed = True
+            while self.items:
+                self._discard(self.items.popleft())
+
+    async def _drain(self):
+        while True:
+            if not self.items:
+                self.ready.clear()
+                await self.ready.wait()
+                continue
+            kind, _, data = self.items.popleft()
+            if kind == 'audio':
+                if not isinstance(data, bytes):
+                    try:
+                        data = await data
+                    except Exception as e:
+                        # Ex: BlobNotFound quando o blob store não é
+                        # compartilhado entre os nós ou o TTL já expirou
+                        logger.warning('Áudio sintetizado indisponível, descartado: %r', e)
+                        self.dropped_audio += 1
+                        continue
+                await self.send(bytes_data=data)
+            else:
+                await self.send(text_data=json.dumps(data))
+            self.sent += 1
+
+    def stats(self):
+        return {
+            'depth': len(self.items),
+            'sent': self.sent,
+            'dropped_audio': self.dropped_audio,
+            'dropped_text': self.dropped_text,
+            'coalesced': self.coalesced,
+        }
+
+
+def stats():
+    """
+    Métricas agregadas de todas as filas de saída do processo.
+    """
+    totals = {'connections': 0, 'depth': 0, 'max_depth': 0, 'sent': 0,
+              'dropped_audio': 0, 'dropped_text': 0, 'coalesced': 0}
+    for queue in list(_queues):
+        queue_stats = queue.stats()
+        totals['connections'] += 1
+        totals['max_depth'] = max(totals['max_depth'], queue_stats['depth'])
+        for key in ('depth', 'sent', 'dropped_audio', 'dropped_text', 'coalesced'):
+            totals[key] += queue_stats[key]
+    return totals
+
+
+def _ensure_reporter():
+    global _report_task
+    interval = get_config()['REPORT_INTERVAL']
+    if interval and (_report_task is None or _report_task.done()):
+        _report_task = asyncio.ensure_future(_report_loop(interval))
+
+
+async def _report_loop(interval):
+    # Encerra quando não há mais filas; a próxima conexão reinicia o loop
+    while _queues:
+        await asyncio.sleep(interval)
+        totals = stats()
+        if totals['connections']:
+            logger.info(
+                'Filas de saída: %s', ' '.join(f'{key}={value}' for key, value in totals.items()),
+                extra={'outbound_queues': totals},
+            )
@@ -0,0 +1,167 @@
+# translation_service/profiler.py
+import asyncio
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from collections import Counter
+
+from core.conf import app_config
+
+DEFAULT_CONFIG = {
+    'OUTPUT_DIR': '/tmp/translation_saas_profiles',
+    # Janela máxima de uma sessão, em segundos
+    'MAX_DURATION': 300,
+}
+
+# Métodos do TranslationConsumer tratados como etapas do pipeline
+CONSUMER_PREFIX = 'TranslationConsumer.'
+
+
+def get_config():
+    return app_config('PROFILER', DEFAULT_CONFIG)
+
+
+def _frame_label(code):
+    name = getattr(code, 'co_qualname', code.co_name)
+    return f'{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'.replace(';', ',')
+
+
+def _tags(frames):
+    """
+    Encontra reunião e etapa do pipeline na pilha, do frame mais interno
+    para o mais externo (ex: a lambda enviada ao executor por
+    transcribe_audio vira a etapa 'transcribe_audio').
+    """
+    for frame in frames:
+        name = getattr(frame.f_code, 'co_qualname', frame.f_code.co_name)
+        if not name.startswith(CONSUMER_PREFIX):
+            continue
+        consumer = frame.f_locals.get('self')
+        meeting_id = getattr(consumer, 'meeting_id', None)
+        return f'meeting_{meeting_id}', name[len(CONSUMER_PREFIX):].split('.')[0]
+    return 'untagged', 'other'
+
+
+class SamplingProfiler:
+    """
+    Profiler por amostragem de todas as threads do worker.
+
+    Uma thread daemon lê sys._current_frames() a cada `interval` e conta as
+    pilhas no formato collapsed (compatível com flamegraph.pl/speedscope),
+    prefixadas com a reunião e a etapa do pipeline do TranslationConsumer.
+    Uma task no event loop mede o atraso do loop no mesmo período. Nada é
+    instalado no interpretador: fora de uma sessão o custo é zero.
+    """
+
+    def __init__(self, duration, interval=0.005, meeting_id=None):
+        config = get_config()
+        self.duration = min(duration, config['MAX_DURATION'])
+        self.interval = interval
+        self.meeting_id = meeting_id
+        self.output_dir = config['OUTPUT_DIR']
+        self.stacks = Counter()
+        self.lags = []
+        self.samples = 0
+        self.stopped = threading.Event()
+
+    def start(self, loop):
+        self.started_at = time.time()
+        self.lag_task = loop.create_task(self._measure_lag())
+        self.thread = threading.Thread(target=self._sample_loop, name='profiler', daemon=True)
+        self.thread.start()
+
+    def _sample_loop(self):
+        own_thread = threading.get_ident()
+        names = {}
+        deadline = time.monotonic() + self.duration
+        while time.monotonic() < deadline and not self.stopped.is_set():
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                frames = []
+                while frame is not None:
+                    frames.append(frame)
+                    frame = frame.f_back
+                meeting, stage = _tags(frames)
+                if thread_id not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                stack = [meeting, stage, f'thread {names.get(thread_id, thread_id)}']
+                stack += [_frame_label(f.f_code) for f in reversed(frames)]
+                self.stacks[';'.join(stack)] += 1
+            frame = frames = None
+            self.samples += 1
+            time.sleep(self.interval)
+        self.stopped.set()
+
+    async def _measure_lag(self):
+        loop = asyncio.get_running_loop()
+        while not self.stopped.is_set():
+            scheduled = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lags.append(loop.time() - scheduled - self.interval)
+        await loop.run_in_executor(None, self.write)
+
+    def _lag_summary(self):
+        if not self.lags:
+            return {}
+        lags = sorted(self.lags)
+
+        def percentile(p):
+            return lags[min(len(lags) - 1, int(p * len(lags)))] * 1000
+
+        return {
+            'samples': len(lags),
+            'mean_ms': sum(lags) / len(lags) * 1000,
+            'p50_ms': percentile(0.50),
+            'p95_ms': percentile(0.95),
+            'p99_ms': percentile(0.99),
+            'max_ms': lags[-1] * 1000,
+        }
+
+    def write(self):
+        """
+        Grava <base>.collapsed (pilhas) e <base>.json (resumo e lag do loop).
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = time.strftime('%Y%m%dT%H%M%S', time.gmtime(self.started_at))
+        base = os.path.join(
+            self.output_dir,
+            f'{socket.gethostname()}-{os.getpid()}-meeting_{self.meeting_id}-{stamp}'
+        )
+        with open(f'{base}.collapsed', 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f'{stack} {count}\n')
+        with open(f'{base}.json', 'w') as f:
+            json.dump({
+                'meeting_id': self.meeting_id,
+                'pid': os.getpid(),
+                'started_at': self.started_at,
+                'duration': self.duration,
+                'interval': self.interval,
+                'samples': self.samples,
+                'event_loop_lag': self._lag_summary(),
+            }, f, indent=2)
+        return base
+
+
+_active = None
+
+
+def start_profiling(duration, interval=0.005, meeting_id=None):
+    """
+    Inicia uma sessão de profiling no worker, se não houver outra ativa.
+
+    Deve ser chamada de dentro do event loop.
+
+    Returns:
+        O SamplingProfiler iniciado, ou None se já havia uma sessão ativa
+    """
+    global _active
+    if _active is not None and not _active.stopped.is_set():
+        return None
+    _active = SamplingProfiler(duration, interval, meeting_id)
+    _active.start(asyncio.get_running_loop())
+    return _active
@@ -0,0 +1,43 @@
+# translation_service/providers.py
+import importlib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# SDKs dos provedores, importados sob demanda pelos serviços. São dos imports
+# mais lentos do processo, por isso nunca entram no caminho de inicialização.
+PROVIDER_MODULES = (
+    'google.cloud.speech',
+    'google.cloud.translate_v2',
+    'boto3',
+)
+
+
+def prewarm(modules=PROVIDER_MODULES, background=True):
+    """
+    Pré-carrega os SDKs dos provedores.
+
+    Args:
+        modules: Módulos a importar
+        background: Se True, importa em uma thread daemon para não atrasar
+            o início do worker (o primeiro uso aguarda o import em andamento
+            pelo lock de import do Python)
+
+    Returns:
+        A thread iniciada, ou None se executado em primeiro plano
+    """
+    def load():
+        for name in modules:
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                logger.warning('SDK de provedor indisponível: %s', name)
+
+    if not background:
+        load()
+        return None
+
+    thread = threading.Thread(target=load, name='provider-prewarm', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,8 @@
+# translation_service/routing.py
+from django.urls import re_path
+
+from .streaming import TranslationConsumer
+
+websocket_urlpatterns = [
+    re_path(r'^ws/meetings/(?P<meeting_id>\d+)/$', TranslationConsumer.as_asgi()),
+]
@@ -0,0 +1,347 @@
+# translation_service/scheduler.py
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import socket
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.utils import timezone
+
+from core.conf import app_config
+
+# Peso de cada plano na fila justa: um tenant enterprise recebe 8x a vazão
+# de um tenant free quando ambos estão competindo pelo mesmo provedor.
+PLAN_WEIGHTS = {
+    'free': 1,
+    'basic': 2,
+    'premium': 4,
+    'enterprise': 8,
+}
+
+DEFAULT_CONFIG = {
+    # Intervalo (s) de sincronização dos contadores em memória com o cache
+    'SYNC_INTERVAL': 5,
+    # Limites por provedor: taxa (req/s), rajada e chamadas simultâneas
+    'PROVIDERS': {
+        'speech': {'rate': 50, 'burst': 100, 'concurrency': 16},
+        'translate': {'rate': 100, 'burst': 200, 'concurrency': 8},
+        'polly': {'rate': 80, 'burst': 160, 'concurrency': 8},
+        # Backend local: sem cota externa, limitado pela CPU do pool
+        'local_speech': {'rate': 1000, 'burst': 1000, 'concurrency': 16},
+    },
+}
+
+
+def get_config():
+    return app_config('TRANSLATION_SCHEDULER', DEFAULT_CONFIG)
+
+
+class TenantLimitExceeded(Exception):
+    """
+    Levantada quando um tenant excede os limites do seu plano.
+    """
+
+
+class TokenBucket:
+    """
+    Token bucket para limitar a taxa de chamadas a um provedor.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, tokens=1):
+        tokens = min(tokens, self.capacity)
+        while True:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return
+            await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+
+class ProviderQueue:
+    """
+    Fila justa ponderada (start-time fair queueing) para um provedor.
+
+    Cada job recebe uma tag de início igual ao maior valor entre o tempo
+    virtual da fila e a tag de término do último job do mesmo tenant. Jobs
+    são despachados em ordem de tag, então um tenant com muitos jobs na fila
+    só avança na proporção do seu peso, sem atrasar os demais.
+    """
+
+    def __init__(self, name, executor, rate, burst, concurrency):
+        self.name = name
+        self.executor = executor
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = concurrency
+        self.running = 0
+        self.virtual_time = 0.0
+        self.last_finish = {}
+        self.heap = []
+        self.sequence = itertools.count()
+
+    def submit(self, tenant_id, weight, fn, cost):
+        future = asyncio.get_running_loop().create_future()
+        start = max(self.virtual_time, self.last_finish.get(tenant_id, 0.0))
+        self.last_finish[tenant_id] = start + cost / weight
+        heapq.heappush(self.heap, (start, next(self.sequence), tenant_id, fn, cost, future))
+        self._dispatch()
+        return future
+
+    def _dispatch(self):
+        while self.heap and self.running < self.concurrency:
+            start, _, tenant_id, fn, cost, future = heapq.heappop(self.heap)
+            self.virtual_time = start
+            if future.cancelled():
+                continue
+            self.running += 1
+            asyncio.ensure_future(self._run(fn, cost, future))
+
+    async def _run(self, fn, cost, future):
+        try:
+            await self.bucket.acquire(cost)
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.executor, fn)
+            if not future.done():
+                future.set_result(result)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        finally:
+            self.running -= 1
+            self._dispatch()
+
+    def depth(self):
+        return len(self.heap)
+
+
+class TenantUsage:
+    """
+    Contadores de reuniões ativas por tenant.
+
+    Cada worker mantém seus contadores em memória e, a cada SYNC_INTERVAL,
+    publica as reuniões que hospeda no cache compartilhado e lê as dos
+    demais workers. As verificações de limite usam apenas o estado em
+    memória; a visão remota de um tenant expira após 3x SYNC_INTERVAL e é
+    relida do cache na próxima admissão.
+    """
+
+    def __init__(self, sync_interval):
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        self.sync_interval = sync_interval
+        self.max_age = 3 * sync_interval
+        self.local = defaultdict(Counter)
+        self.remote = {}
+
+    def remote_meetings(self, tenant_id):
+        """
+        Reuniões do tenant nos demais workers, ou None se a visão expirou.
+        """
+        entry = self.remote.get(tenant_id)
+        if entry is None or time.monotonic() - entry[0] > self.max_age:
+            return None
+        return entry[1]
+
+    def update_remote(self, remote):
+        now = time.monotonic()
+        for tenant_id, meeting_ids in remote.items():
+            self.remote[tenant_id] = (now, meeting_ids)
+        for tenant_id in [t for t, entry in self.remote.items() if now - entry[0] > self.max_age]:
+            del self.remote[tenant_id]
+
+    def active_meetings(self, tenant_id):
+        local = {meeting_id for meeting_id, count in self.local.get(tenant_id, {}).items() if count > 0}
+        return local | (self.remote_meetings(tenant_id) or set())
+
+    def open(self, tenant_id, meeting_id):
+        self.local[tenant_id][meeting_id] += 1
+
+    def close(self, tenant_id, meeting_id):
+        meetings = self.local[tenant_id]
+        meetings[meeting_id] -= 1
+        if meetings[meeting_id] <= 0:
+            del meetings[meeting_id]
+
+    def snapshot(self):
+        """
+        Copia os contadores locais (chamar no event loop).
+
+        Tenants sem reuniões locais entram uma última vez, vazios, para que
+        o sync remova a entrada deste worker do cache.
+        """
+        snapshot = {tenant_id: list(meetings) for tenant_id, meetings in self.local.items()}
+        for tenant_id, meeting_ids in snapshot.items():
+            if not meeting_ids:
+                del self.local[tenant_id]
+        return snapshot
+
+    def _key(self, tenant_id):
+        return f'tenant_usage:{tenant_id}'
+
+    def _timeout(self):
+        # timeout=0 no cache do Django expira a entrada imediatamente
+        return max(1, math.ceil(self.max_age))
+
+    def _other_workers(self, workers, now):
+        return {
+            worker: entry for worker, entry in (workers or {}).items()
+            if entry[0] > now and worker != self.worker_id
+        }
+
+    def fetch(self, tenant_id):
+        """
+        Lê do cache as reuniões do tenant nos demais workers (bloqueante).
+        """
+        from django.core.cache import cache
+
+        remote = set()
+        for _, ids in self._other_workers(cache.get(self._key(tenant_id)), time.time()).values():
+            remote.update(ids)
+        return remote
+
+    def sync(self, snapshot):
+        """
+        Publica o snapshot no cache e retorna as reuniões dos demais workers.
+
+        Além dos tenants do snapshot, relê a visão remota de todo tenant que
+        ainda está em self.remote, para que ela não fique congelada depois
+        que a última reunião local termina. Bloqueante, deve rodar em executor.
+        """
+        from django.core.cache import cache
+
+        now = time.time()
+        expires = now + self.max_age
+        remote = {}
+        for tenant_id, meeting_ids in snapshot.items():
+            key = self._key(tenant_id)
+            workers = self._other_workers(cache.get(key), now)
+            remote[tenant_id] = set()
+            for _, ids in workers.values():
+                remote[tenant_id].update(ids)
+
+            if meeting_ids:
+                workers[self.worker_id] = (expires, meeting_ids)
+            cache.set(key, workers, timeout=self._timeout())
+
+        for tenant_id in list(self.remote):
+            if tenant_id not in remote:
+                remote[tenant_id] = self.fetch(tenant_id)
+        return remote
+
+
+class TenantScheduler:
+    """
+    Escalonador entre o TranslationConsumer e os serviços de provedores.
+
+    Mantém uma fila justa por provedor ponderada pelo plano do tenant,
+    limita a taxa de chamadas de cada provedor com token buckets e aplica
+    os limites de reuniões simultâneas e de duração do plano.
+    """
+
+    def __init__(self, config=None):
+        config = config or get_config()
+        providers = config['PROVIDERS']
+        self.executor = ThreadPoolExecutor(
+            max_workers=sum(p['concurrency'] for p in providers.values()),
+            thread_name_prefix='provider',
+        )
+        self.queues = {
+            name: ProviderQueue(name, self.executor, p['rate'], p['burst'], p['concurrency'])
+            for name, p in providers.items()
+        }
+        self.usage = TenantUsage(config['SYNC_INTERVAL'])
+        self._sync_task = None
+
+    def _ensure_sync_task(self):
+        if self._sync_task is None or self._sync_task.done():
+            self._sync_task = asyncio.ensure_future(self._sync_loop())
+
+    async def _sync_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                snapshot = self.usage.snapshot()
+                remote = await loop.run_in_executor(None, self.usage.sync, snapshot)
+                self.usage.update_remote(remote)
+            except Exception:
+                # Cache indisponível: seguimos com os contadores locais
+                pass
+            await asyncio.sleep(self.usage.sync_interval)
+
+    async def admit(self, tenant, meeting_id):
+        """
+        Registra uma conexão na reunião, respeitando max_meetings do tenant.
+
+        Se a visão remota do tenant não existe ou expirou (ex: primeira
+        conexão do tenant neste worker), ela é lida do cache antes da decisão.
+        """
+        self._ensure_sync_task()
+        if self.usage.remote_meetings(tenant.id) is None:
+            loop = asyncio.get_running_loop()
+            try:
+                remote = await loop.run_in_executor(None, self.usage.fetch, tenant.id)
+                self.usage.update_remote({tenant.id: remote})
+            except Exception:
+                # Cache indisponível: decide só com os contadores locais
+                pass
+        active = self.usage.active_meetings(tenant.id)
+        if meeting_id not in active and len(active) >= tenant.max_meetings:
+            raise TenantLimitExceeded(
+                f'Tenant {tenant.id} atingiu o limite de {tenant.max_meetings} reuniões simultâneas'
+            )
+        self.usage.open(tenant.id, meeting_id)
+
+    def release(self, tenant, meeting_id):
+        self.usage.close(tenant.id, meeting_id)
+
+    def check_duration(self, tenant, meeting):
+        """
+        Verifica se a reunião ainda está dentro da duração máxima do plano.
+        """
+        if timezone.now() - meeting.start_time > timedelta(minutes=tenant.max_duration):
+            raise TenantLimitExceeded(
+                f'Reunião {meeting.id} excedeu a duração máxima de {tenant.max_duration} minutos'
+            )
+
+    async def submit(self, tenant, provider, fn, cost=1):
+        """
+        Enfileira uma chamada bloqueante ao provedor e aguarda o resultado.
+
+        Args:
+            tenant: Tenant dono da chamada
+            provider: Nome do provedor ('speech', 'translate', 'polly')
+            fn: Função sem argumentos que realiza a chamada
+            cost: Custo relativo da chamada (ex: segundos de áudio)
+
+        Returns:
+            Resultado de fn()
+        """
+        weight = PLAN_WEIGHTS.get(tenant.plan, 1)
+        return await self.queues[provider].submit(tenant.id, weight, fn, cost)
+
+
+_scheduler = None
+
+
+def get_scheduler():
+    """
+    Retorna o escalonador compartilhado pelo processo.
+    """
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = TenantScheduler()
+    return _scheduler
@@ -1,31 +1,49 @@
 # translation_service/speech_to_text.py
 import os
-from google.cloud import speech
 import io
 
 class SpeechToTextService:
-    def __init__(self):
-        self.client = speech.SpeechClient()
+    BACKENDS = ('google', 'local')
+    
+    def __init__(self, backend='google'):
+        self.backend = backend if backend in self.BACKENDS else 'google'
+        self._client = None
+    
+    @property
+    def client(self):
+        # SDK do Google importado só no primeiro uso (import lento)
+        if self._client is None:
+            from google.cloud import speech
+            self._client = speech.SpeechClient()
+        return self._client
     
     def transcribe_stream(self, audio_content, language_code='en-US', sample_rate=16000, streaming=True):
         """
-        Transcrever áudio usando Google Speech-to-Text API.
+        Transcrever áudio usando Google Speech-to-Text API ou o backend local
+        (modelo em CPU, para tenants que não podem enviar áudio para fora).
         
         Args:
             audio_content: Conteúdo de áudio em bytes
             language_code: Código do idioma (ex: 'en-US', 'pt-BR')
             sample_rate: Taxa de amostragem do áudio em Hz
             streaming: Se True, usa streaming API, caso contrário usa reconhecimento síncrono
+                (ignorado no backend local, que sempre retorna o texto da janela)
             
         Returns:
             Texto transcrito
         """
+        if self.backend == 'local':
+            from .local_speech import get_local_engine
+            return get_local_engine().transcribe(audio_content, language_code, sample_rate)
+        
         if streaming:
             return self._transcribe_streaming(audio_content, language_code, sample_rate)
         else:
             return self._transcribe_sync(audio_content, language_code, sample_rate)
     
     def _transcribe_sync(self, audio_content, language_code, sample_rate):
+        from google.cloud import speech
+        
         audio = speech.RecognitionAudio(content=audio_content)
         
         config = speech.RecognitionConfig(
@@ -46,6 +64,8 @@ class SpeechToTextService:
         return transcript
     
     def _transcribe_streaming(self, audio_generator, language_code, sample_rate):
+        from google.cloud import speech
+        
         config = speech.StreamingRecognitionConfig(
             config=speech.RecognitionConfig(
                 encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
@@ -5,7 +5,12 @@ from channels.generic.websocket import AsyncWebsocketConsumer
 from .speech_to_text import SpeechToTextService
 from .translation import TranslationService
 from .text_to_speech import TextToSpeechService
+from .scheduler import TenantLimitExceeded, get_scheduler
+from .outbound import OutboundQueue
+from .audio_formats import negotiate, transcode_cache
+from .blob_store import get_blob_cache
 from core.models import Meeting, Participant, TranscriptionSegment, TranslationSegment
+from core.stats import get_stats_buffer
 
 class TranslationConsumer(AsyncWebsocketConsumer):
     """
@@ -24,6 +29,16 @@ class TranslationConsumer(AsyncWebsocketConsumer):
             await self.close(code=4000)
             return
         
+        # Aplicar limites do plano do tenant
+        self.tenant = self.meeting.tenant
+        self.scheduler = get_scheduler()
+        try:
+            await self.scheduler.admit(self.tenant, self.meeting.id)
+        except TenantLimitExceeded:
+            await self.close(code=4029)
+            return
+        self.admitted = True
+        
         # Adicionar ao grupo da reunião
         self.room_group_name = f'meeting_{self.meeting_id}'
         await self.channel_layer.group_add(
@@ -32,18 +47,38 @@ class TranslationConsumer(AsyncWebsocketConsumer):
         )
         
         # Inicializar serviços
-        self.speech_service = SpeechToTextService()
+        self.speech_service = SpeechToTextService(backend=self.tenant.speech_backend)
         self.translation_service = TranslationService()
         self.speech_synthesis_service = TextToSpeechService()
+        self.audio_format = negotiate()
+        self.audio_input = None  # áudio já chega em LINEAR16 mono 16 kHz
         
         await self.accept()
+        
+        # Fila de saída própria: envios ao socket não bloqueiam o channel layer
+        self.outbound = OutboundQueue(self.send)
+        self.outbound.start()
+        
+        # Informar o formato de áudio em vigor (PCM se não houver ffmpeg)
+        self.outbound.put_text({
+            'type': 'audio_format',
+            **self.audio_format.describe()
+        })
     
     async def disconnect(self, close_code):
+        # Liberar a vaga da reunião no escalonador (só se foi admitida)
+        if getattr(self, 'admitted', False):
+            self.scheduler.release(self.tenant, self.meeting.id)
+        
+        if hasattr(self, 'outbound'):
+            await self.outbound.close()
+        
         # Remover do grupo da reunião
-        await self.channel_layer.group_discard(
-            self.room_group_name,
-            self.channel_name
-        )
+        if hasattr(self, 'room_group_name'):
+            await self.channel_layer.group_discard(
+                self.room_group_name,
+                self.channel_name
+            )
         
         # Atualizar horário de saída do participante
         if hasattr(self, 'participant'):
@@ -55,7 +90,11 @@ class TranslationConsumer(AsyncWebsocketConsumer):
         """
         # Processar dados de áudio
         if bytes_data:
-            await self.process_audio(bytes_data)
+            # Normalizar para LINEAR16 mono 16 kHz se o cliente declarou outro formato
+            if self.audio_input is not None:
+                bytes_data = self.audio_input.process(bytes_data)
+            if bytes_data:
+                await self.process_audio(bytes_data)
         
         # Processar mensagens de texto/controle
         elif text_data:
@@ -73,6 +112,21 @@ class TranslationConsumer(AsyncWebsocketConsumer):
                     
                     if listening_language:
                         await self.update_listening_language(listening_language)
+                    
+                    # Formato do áudio capturado pelo cliente (ex: 48 kHz estéreo float)
+                    if any(key in data for key in ('sample_rate', 'channels', 'sample_format')):
+                        await self.configure_audio_input(data)
+                    
+                    # Formato do áudio sintetizado recebido por este ouvinte
+                    if 'audio_format' in data or 'audio_bitrate' in data:
+                        self.audio_format = negotiate(
+                            data.get('audio_format', self.audio_format.name),
+                            data.get('audio_bitrate', self.audio_format.bitrate)
+                        )
+                        self.outbound.put_text({
+                            'type': 'audio_format',
+                            **self.audio_format.describe()
+                        })
                 
                 elif message_type == 'start_meeting':
                     # Iniciar/ativar reunião
@@ -85,10 +139,35 @@ class TranslationConsumer(AsyncWebsocketConsumer):
             except json.JSONDecodeError:
                 pass
     
+    async def configure_audio_input(self, data):
+        """
+        Configura a normalização do áudio recebido conforme o 'config'
+        """
+        # numpy só é importado quando algum cliente precisa de conversão
+        from .audio_input import AudioFormatError, AudioNormalizer
+        
+        try:
+            normalizer = AudioNormalizer(
+                sample_rate=data.get('sample_rate', 16000),
+                channels=data.get('channels', 1),
+                sample_format=data.get('sample_format', 's16le')
+            )
+        except AudioFormatError as e:
+            self.outbound.put_text({'type': 'error', 'message': str(e)})
+            return
+        self.audio_input = None if normalizer.passthrough else normalizer
+    
     async def process_audio(self, audio_data):
         """
         Processa chunks de áudio recebidos
         """
+        # Encerrar se a reunião passou da duração máxima do plano
+        try:
+            self.scheduler.check_duration(self.tenant, self.meeting)
+        except TenantLimitExceeded:
+            await self.close(code=4029)
+            return
+        
         # Obter idioma do participante
         source_language = self.participant.speaking_language
         
@@ -97,7 +176,9 @@ class TranslationConsumer(AsyncWebsocketConsumer):
         
         if transcription:
             # Salvar transcrição
-            transcription_segment = await self.save_transcription(transcription, source_language)
+            # Duração da fala (LINEAR16 a 16 kHz = 32000 bytes/s)
+            duration = len(audio_data) / 32000
+            transcription_segment = await self.save_transcription(transcription, source_language, duration)
             
             # Enviar transcrição para todos os participantes
             await self.channel_layer.group_send(
@@ -122,13 +203,16 @@ class TranslationConsumer(AsyncWebsocketConsumer):
                         # Sintetizar voz
                         audio = await self.synthesize_speech(translation, target_language)
                         
+                        # O áudio vai para o blob store; o evento leva só o hash
+                        audio_key = await get_blob_cache().put(audio) if audio else None
+                        
                         # Enviar tradução e áudio para participantes que ouvem nesse idioma
                         await self.channel_layer.group_send(
                             self.room_group_name,
                             {
                                 'type': 'translation_message',
                                 'translation': translation,
-                                'audio': audio,
+                                'audio_key': audio_key,
                                 'participant_id': self.participant.id,
                                 'source_language': source_language,
                                 'target_language': target_language
@@ -139,11 +223,15 @@ class TranslationConsumer(AsyncWebsocketConsumer):
         """
         Transcreve o áudio usando o serviço de reconhecimento de voz
         """
-        # Esta é uma operação potencialmente bloqueante, então usamos run_in_executor
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(
-            None, 
-            lambda: self.speech_service.transcribe_stream(audio_data, language_code)
+        # Operação bloqueante: passa pelo escalonador, que a executa em thread
+        # respeitando a fila justa do tenant. O custo é a duração do áudio
+        # (LINEAR16 a 16 kHz) para que falas longas pesem mais na fila.
+        provider = 'local_speech' if self.speech_service.backend == 'local' else 'speech'
+        result = await self.scheduler.submit(
+            self.tenant,
+            provider,
+            lambda: self.speech_service.transcribe_stream(audio_data, language_code),
+            cost=max(1, len(audio_data) / 32000)
         )
         return result
     
@@ -151,21 +239,23 @@ class TranslationConsumer(AsyncWebsocketConsumer):
         """
         Traduz o texto para o idioma alvo
         """
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(
-            None,
+        result = await self.scheduler.submit(
+            self.tenant,
+            'translate',
             lambda: self.translation_service.translate_text(text, target_language, source_language)
         )
         return result
     
     async def synthesize_speech(self, text, language_code):
         """
-        Sintetiza o texto em voz
+        Sintetiza o texto em voz (PCM canônico, transcodificado por ouvinte)
         """
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(
-            None,
-            lambda: self.speech_synthesis_service.synthesize_speech(text, language_code)
+        result = await self.scheduler.submit(
+            self.tenant,
+            'polly',
+            lambda: self.speech_synthesis_service.synthesize_speech(
+                text, language_code, output_format='pcm', streaming=False
+            )
         )
         return result
     
@@ -176,12 +266,12 @@ class TranslationConsumer(AsyncWebsocketConsumer):
         """
         # Enviar apenas se a mensagem for de interesse do participante
         if event['language'] == self.participant.listening_language:
-            await self.send(text_data=json.dumps({
+            self.outbound.put_text({
                 'type': 'transcription',
                 'text': event['transcription'],
                 'participant_id': event['participant_id'],
                 'language': event['language']
-            }))
+            }, coalesce_key=('transcription', event['participant_id']))
     
     async def translation_message(self, event):
         """
@@ -189,17 +279,24 @@ class TranslationConsumer(AsyncWebsocketConsumer):
         """
         # Enviar apenas se o idioma alvo for o que o participante está ouvindo
         if event['target_language'] == self.participant.listening_language:
-            await self.send(text_data=json.dumps({
+            self.outbound.put_text({
                 'type': 'translation',
                 'text': event['translation'],
                 'participant_id': event['participant_id'],
                 'source_language': event['source_language'],
                 'target_language': event['target_language']
-            }))
+            }, coalesce_key=('translation', event['participant_id']))
             
-            # Enviar o áudio sintetizado
-            if event.get('audio'):
-                await self.send(bytes_data=event['audio'])
+            # Enviar o áudio sintetizado no formato negociado; a busca no blob
+            # store e a transcodificação são compartilhadas por todos os
+            # ouvintes do worker
+            if event.get('audio_key'):
+                audio_key = event['audio_key']
+                self.outbound.put_audio(asyncio.ensure_future(transcode_cache.get(
+                    audio_key,
+                    self.audio_format,
+                    lambda: get_blob_cache().get(audio_key)
+                )))
     
     # Métodos auxiliares para operações no banco de dados
     async def get_meeting(self):
@@ -210,7 +307,11 @@ class TranslationConsumer(AsyncWebsocketConsumer):
         from django.shortcuts import get_object_or_404
         
         get_meeting = sync_to_async(get_object_or_404)
-        return await get_meeting(Meeting, id=self.meeting_id, is_active=True)
+        return await get_meeting(
+            Meeting.objects.select_related('tenant'),
+            id=self.meeting_id,
+            is_active=True
+        )
     
     async def get_or_create_participant(self):
         """
@@ -288,6 +389,9 @@ class TranslationConsumer(AsyncWebsocketConsumer):
         save = sync_to_async(self.meeting.save)
         await save()
         
+        # Gravar as estatísticas pendentes desta reunião
+        await get_stats_buffer().flush(self.meeting.id)
+        
         # Notificar todos os participantes
         await self.channel_layer.group_send(
             self.room_group_name,
@@ -300,11 +404,19 @@ class TranslationConsumer(AsyncWebsocketConsumer):
         """
         Enviar notificação de que a reunião terminou
         """
-        await self.send(text_data=json.dumps({
+        self.outbound.put_text({
             'type': 'meeting_ended',
-        }))
+        })
+        
+    async def profiler_start(self, event):
+        """
+        Inicia o profiler por amostragem neste worker (manage.py profile_meeting)
+        """
+        from .profiler import start_profiling
         
-    async def save_transcription(self, text, language):
+        start_profiling(event['duration'], event['interval'], event['meeting_id'])
+    
+    async def save_transcription(self, text, language, duration=0):
         """
         Salva um segmento de transcrição no banco de dados
         """
@@ -315,8 +427,10 @@ class TranslationConsumer(AsyncWebsocketConsumer):
             meeting=self.meeting,
             participant=self.participant,
             original_text=text,
-            source_language=language
+            source_language=language,
+            duration=duration
         )
+        get_stats_buffer().record_transcription(self.meeting.id, self.participant.id, language, duration)
         return segment
     
     async def save_translation(self, transcription_segment, translated_text, target_language):
@@ -330,4 +444,5 @@ class TranslationConsumer(AsyncWebsocketConsumer):
             transcription=transcription_segment,
             target_language=target_language,
             translated_text=translated_text
-        )
\ No newline at end of file
+        )
+        get_stats_buffer().record_translation(self.meeting.id, target_language, len(translated_text))
\ No newline at end of file
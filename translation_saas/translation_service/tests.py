@@ -1,3 +1,716 @@
-from django.test import TestCase
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import numpy as np
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from accounts.models import Tenant, User
+from core.models import Meeting
+
+from . import audio_formats, outbound, profiler, scheduler, streaming
+from .audio_input import AudioFormatError, AudioNormalizer
+from .blob_store import BlobCache, BlobNotFound, FileSystemBlobStore, RedisBlobStore
+from .local_speech import BUNDLED_MODEL, CTCModel, LocalSpeechEngine, WhisperModel
+from .outbound import OutboundQueue
+from .routing import websocket_urlpatterns
+from .scheduler import ProviderQueue, TenantLimitExceeded, TenantScheduler, TokenBucket
+
+try:
+    import faster_whisper
+except ImportError:
+    faster_whisper = None
+
+
+class AsgiTests(SimpleTestCase):
+    def test_entry_point_does_not_import_provider_sdks(self):
+        # Processo novo: os testes podem já ter importado os SDKs
+        code = (
+            'import sys, translation_saas.asgi; '
+            'print(",".join(m for m in ("google.cloud.speech", "google.cloud.translate_v2", "boto3") '
+            'if m in sys.modules))'
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', code],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            capture_output=True, text=True, check=True,
+            env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'translation_saas.settings',
+                 'TRANSLATION_PREWARM_PROVIDERS': '0'},
+        )
+        self.assertEqual(result.stdout.strip(), '')
+
+    def test_meeting_route_resolves_to_consumer(self):
+        match = websocket_urlpatterns[0].resolve('ws/meetings/42/')
+        self.assertIs(match.func.consumer_class, streaming.TranslationConsumer)
+        self.assertEqual(match.kwargs, {'meeting_id': '42'})
+
+
+class CTCModelTests(SimpleTestCase):
+    def setUp(self):
+        self.model = CTCModel(BUNDLED_MODEL)
+
+    def test_transcribes_batch_of_different_lengths(self):
+        windows = [self.model.render('hello world'), self.model.render('ok'), b'']
+        self.assertEqual(self.model.transcribe_batch(windows, 'en-US'), ['hello world', 'ok', ''])
+
+    def test_silence_is_blank(self):
+        self.assertEqual(self.model.transcribe_batch([bytes(32000)], 'en-US'), [''])
+
+
+@skipUnless(faster_whisper, 'faster-whisper não instalado')
+class WhisperModelTests(SimpleTestCase):
+    def test_batch_runs_one_encode_and_one_generate(self):
+        from faster_whisper.feature_extractor import FeatureExtractor
+
+        class FakeTokenizer:
+            sot_sequence = (1, 2, 3)
+            no_timestamps = 4
+
+            def __init__(self, hf_tokenizer, multilingual, task=None, language=None):
+                self.language = language
+
+            def decode(self, tokens):
+                return f' {self.language}:{len(tokens)} '
+
+        ctranslate2_model = mock.Mock(is_multilingual=True)
+        ctranslate2_model.generate.side_effect = lambda encoded, prompts, **options: [
+            SimpleNamespace(sequences_ids=[[7] * (i + 1)]) for i in range(len(prompts))
+        ]
+        model = WhisperModel.__new__(WhisperModel)
+        model.model = SimpleNamespace(
+            model=ctranslate2_model,
+            hf_tokenizer=None,
+            feature_extractor=FeatureExtractor(),
+            encode=mock.Mock(return_value='encoded'),
+            max_length=448,
+        )
+
+        windows = [bytes(32000), bytes(8000), b'']
+        with mock.patch('faster_whisper.tokenizer.Tokenizer', FakeTokenizer):
+            texts = model.transcribe_batch(windows, 'pt-BR')
+
+        self.assertEqual(texts, ['pt:1', 'pt:2', 'pt:3'])
+        self.assertEqual(model.model.encode.call_args[0][0].shape, (3, 80, 3000))
+        ctranslate2_model.generate.assert_called_once()
+        encoded, prompts = ctranslate2_model.generate.call_args[0]
+        self.assertEqual(prompts, [[1, 2, 3, 4]] * 3)
+
+
+class LocalSpeechEngineTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.model = CTCModel(BUNDLED_MODEL)
+        cls.engine = LocalSpeechEngine(model=BUNDLED_MODEL, workers=1, max_batch=8, max_wait=0.05)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.engine.shutdown()
+        super().tearDownClass()
+
+    def test_concurrent_speakers_are_batched(self):
+        texts = ['speaker one', 'speaker two', 'hi', 'bye'] * 4
+        windows = [self.model.render(text) for text in texts]
+        batches_before = self.engine.batches
+
+        with ThreadPoolExecutor(max_workers=len(windows)) as executor:
+            results = list(executor.map(self.engine.transcribe, windows))
+
+        self.assertEqual(results, texts)
+        self.assertLess(self.engine.batches - batches_before, len(windows))
+
+    def test_rejects_unexpected_sample_rate(self):
+        with self.assertRaises(ValueError):
+            self.engine.transcribe(self.model.render('hi'), 'en-US', sample_rate=48000)
+
+    def test_broken_pool_fails_calls_instead_of_hanging(self):
+        # Diretório sem modelo: o initializer falha e o pool quebra
+        empty = tempfile.TemporaryDirectory()
+        self.addCleanup(empty.cleanup)
+        engine = LocalSpeechEngine(model=empty.name, workers=1, max_wait=0, timeout=60)
+        self.addCleanup(engine.shutdown)
+        window = self.model.render('hi')
+        for _ in range(3):
+            with self.assertRaises(BrokenProcessPool):
+                engine.transcribe(window)
+        self.assertTrue(engine.batcher.is_alive())
+
+    @override_settings(LOCAL_SPEECH={'MODEL': None})
+    def test_requires_configured_model(self):
+        with self.assertRaises(ImproperlyConfigured):
+            LocalSpeechEngine()
+
+
+class AudioNormalizerTests(SimpleTestCase):
+    def stereo_float_tone(self, frequency, seconds, sample_rate=48000):
+        t = np.arange(int(seconds * sample_rate)) / sample_rate
+        tone = 0.5 * np.sin(2 * np.pi * frequency * t)
+        return np.stack([tone, tone], axis=1).astype('<f4').tobytes()
+
+    def dominant_frequency(self, pcm, sample_rate=16000):
+        samples = np.frombuffer(pcm, dtype='<i2').astype(np.float32)
+        spectrum = np.abs(np.fft.rfft(samples))
+        return np.fft.rfftfreq(len(samples), 1 / sample_rate)[np.argmax(spectrum)]
+
+    def test_passthrough_for_linear16_mono_16k(self):
+        normalizer = AudioNormalizer()
+        self.assertTrue(normalizer.passthrough)
+        self.assertIs(normalizer.process(b'\x01\x02'), b'\x01\x02')
+
+    def test_downmix_and_resample_48k_stereo_float(self):
+        normalizer = AudioNormalizer(sample_rate=48000, channels=2, sample_format='f32le')
+        output = normalizer.process(self.stereo_float_tone(1000, 1.0))
+        self.assertAlmostEqual(len(output) / 2, 16000, delta=2)
+        self.assertAlmostEqual(self.dominant_frequency(output), 1000, delta=2)
+
+    def test_chunking_does_not_change_output(self):
+        data = self.stereo_float_tone(440, 0.5, sample_rate=44100)
+        whole = AudioNormalizer(44100, 2, 'f32le').process(data)
+
+        chunked = AudioNormalizer(44100, 2, 'f32le')
+        # Fatias de tamanho irregular, inclusive no meio de uma amostra
+        parts = [chunked.process(data[i:i + 1001]) for i in range(0, len(data), 1001)]
+        np.testing.assert_allclose(
+            np.frombuffer(b''.join(parts), dtype='<i2'),
+            np.frombuffer(whole, dtype='<i2'),
+            atol=1
+        )
+
+    def test_rejects_unknown_sample_format(self):
+        with self.assertRaises(AudioFormatError):
+            AudioNormalizer(48000, 2, 'mulaw')
+
+
+class NegotiateTests(SimpleTestCase):
+    def test_falls_back_to_pcm_without_transcoder(self):
+        with mock.patch.object(audio_formats, 'transcoder_available', return_value=False):
+            self.assertEqual(audio_formats.negotiate('opus', 32).describe()['format'], 'pcm')
+
+    def test_rounds_bitrate_to_offered(self):
+        with mock.patch.object(audio_formats, 'transcoder_available', return_value=True):
+            audio_format = audio_formats.negotiate('mp3', 100)
+        self.assertEqual(audio_format.name, 'mp3')
+        self.assertIn(audio_format.bitrate, audio_formats.AUDIO_FORMATS['mp3']['bitrates'])
+
+
+class TranscodeCacheTests(SimpleTestCase):
+    def test_concurrent_listeners_share_one_transcode_per_format(self):
+        calls = []
+        loads = []
+
+        def fake_transcode(pcm, audio_format):
+            calls.append(audio_format.key)
+            time.sleep(0.01)
+            return f'{audio_format.key}:'.encode() + pcm
+
+        async def load_pcm():
+            loads.append(1)
+            return b'pcm'
+
+        formats = [audio_formats.AudioFormat('mp3', 64), audio_formats.AudioFormat('opus', 24)]
+
+        async def run():
+            transcode_cache = audio_formats.TranscodeCache()
+            requests = [
+                transcode_cache.get('segment', audio_format, load_pcm)
+                for audio_format in formats for _ in range(10)
+            ]
+            return await asyncio.gather(*requests)
+
+        with mock.patch.object(audio_formats, 'transcode', side_effect=fake_transcode):
+            results = asyncio.run(run())
+
+        self.assertEqual(results, [b'mp3@64:pcm'] * 10 + [b'opus@24:pcm'] * 10)
+        self.assertEqual(sorted(calls), ['mp3@64', 'opus@24'])
+        self.assertEqual(len(loads), 2)
+
+    def test_pcm_is_described_as_little_endian(self):
+        self.assertIn('s16le', audio_formats.negotiate('pcm').mime_type)
+
+
+class ProviderQueueTests(SimpleTestCase):
+    def test_weighted_fair_ordering(self):
+        order = []
+
+        async def run():
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                provider = ProviderQueue('test', executor, rate=1000, burst=1000, concurrency=1)
+                # O tenant 'free' enfileira tudo primeiro, mas o 'enterprise'
+                # (peso 4) passa à frente dos jobs restantes do 'free'
+                futures = [provider.submit('free', 1, lambda i=i: order.append(('free', i)), 1)
+                           for i in range(4)]
+                futures += [provider.submit('enterprise', 4, lambda i=i: order.append(('enterprise', i)), 1)
+                            for i in range(4)]
+                await asyncio.gather(*futures)
+
+        asyncio.run(run())
+        self.assertEqual(order, [('free', 0)] + [('enterprise', i) for i in range(4)]
+                         + [('free', i) for i in range(1, 4)])
+
+
+class TokenBucketTests(SimpleTestCase):
+    def test_waits_for_refill_after_burst(self):
+        async def run():
+            bucket = TokenBucket(rate=50, capacity=2)
+            start = time.monotonic()
+            await bucket.acquire()
+            await bucket.acquire()
+            burst = time.monotonic() - start
+            await bucket.acquire()
+            return burst, time.monotonic() - start
+
+        burst, total = asyncio.run(run())
+        self.assertLess(burst, 0.01)
+        self.assertGreaterEqual(total, 0.015)
+
+
+class SchedulerConfigTests(SimpleTestCase):
+    @override_settings(TRANSLATION_SCHEDULER={'PROVIDERS': {'speech': {'rate': 5}}})
+    def test_provider_override_keeps_other_providers(self):
+        providers = scheduler.get_config()['PROVIDERS']
+        self.assertEqual(set(providers), set(scheduler.DEFAULT_CONFIG['PROVIDERS']))
+        self.assertEqual(providers['speech']['rate'], 5)
+        self.assertEqual(providers['speech']['concurrency'], 16)
+
+
+class TenantAdmissionTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.tenant = SimpleNamespace(id=1, plan='free', max_meetings=1)
+        config = {
+            'SYNC_INTERVAL': 0.05,
+            'PROVIDERS': {'speech': {'rate': 1, 'burst': 1, 'concurrency': 1}},
+        }
+        self.worker_a = TenantScheduler(config)
+        self.worker_b = TenantScheduler(config)
+        self.worker_a.usage.worker_id = 'a'
+        self.worker_b.usage.worker_id = 'b'
+
+    def sync(self, worker):
+        worker.usage.update_remote(worker.usage.sync(worker.usage.snapshot()))
+
+    def test_limit_is_enforced_across_workers(self):
+        async def run():
+            await self.worker_a.admit(self.tenant, 10)
+            self.sync(self.worker_a)
+            # Worker B nunca hospedou o tenant, mas enxerga a reunião de A
+            with self.assertRaises(TenantLimitExceeded):
+                await self.worker_b.admit(self.tenant, 11)
+            # Entrar na mesma reunião não conta como reunião nova
+            await self.worker_b.admit(self.tenant, 10)
+
+        asyncio.run(run())
+
+    def test_ended_remote_meeting_stops_counting(self):
+        async def run():
+            await self.worker_b.admit(self.tenant, 10)
+            self.sync(self.worker_b)
+            await self.worker_a.admit(self.tenant, 10)
+            self.worker_a.release(self.tenant, 10)
+            self.sync(self.worker_a)
+            self.assertEqual(self.worker_a.usage.active_meetings(1), {10})
+
+            self.worker_b.release(self.tenant, 10)
+            self.sync(self.worker_b)
+            # A não hospeda mais o tenant e mesmo assim atualiza a visão remota
+            self.sync(self.worker_a)
+            self.assertEqual(self.worker_a.usage.active_meetings(1), set())
+            await self.worker_a.admit(self.tenant, 11)
+
+        asyncio.run(run())
+
+    def test_stale_remote_view_is_refetched(self):
+        async def run():
+            await self.worker_b.admit(self.tenant, 10)
+            self.sync(self.worker_b)
+            await self.worker_a.admit(self.tenant, 10)
+            self.worker_a.release(self.tenant, 10)
+            self.worker_b.release(self.tenant, 10)
+            self.sync(self.worker_b)
+            # Sem sync em A: a visão remota expira e a admissão relê o cache
+            await asyncio.sleep(0.2)
+            await self.worker_a.admit(self.tenant, 11)
+
+        asyncio.run(run())
+
+
+class OutboundQueueTests(SimpleTestCase):
+    def make_queue(self, high_water=4, max_size=8):
+        self.sent = []
+
+        async def send(text_data=None, bytes_data=None):
+            self.sent.append(text_data if text_data is not None else bytes_data)
+
+        return OutboundQueue(send, high_water=high_water, max_size=max_size)
+
+    def test_sheds_oldest_audio_above_high_water(self):
+        queue = self.make_queue()
+        for i in range(6):
+            queue.put_audio(bytes([i]))
+        # Volta ao high-water descartando os áudios mais antigos
+        self.assertEqual([item[2] for item in queue.items], [bytes([i]) for i in range(2, 6)])
+        self.assertEqual(queue.stats()['dropped_audio'], 2)
+
+    def test_coalesces_text_with_same_key_above_high_water(self):
+        queue = self.make_queue()
+        for i in range(4):
+            queue.put_text({'text': f'a{i}'}, coalesce_key=('translation', 1))
+        queue.put_text({'text': 'b'}, coalesce_key=('translation', 2))
+        queue.put_text({'text': 'a4'}, coalesce_key=('translation', 1))
+
+        texts = [item[2]['text'] for item in queue.items]
+        self.assertEqual(texts, ['a0', 'a1', 'a2', 'a3 a4', 'b'])
+        self.assertEqual(queue.stats()['coalesced'], 1)
+
+    def test_drops_oldest_beyond_max_size(self):
+        queue = self.make_queue(high_water=2, max_size=3)
+        for i in range(5):
+            # Falantes diferentes: nada é agrupado, só descartado
+            queue.put_text({'text': str(i)}, coalesce_key=('translation', i))
+        self.assertEqual([item[2]['text'] for item in queue.items], ['2', '3', '4'])
+        self.assertEqual(queue.stats()['dropped_text'], 2)
+
+    def test_keeps_control_messages_beyond_max_size(self):
+        queue = self.make_queue(high_water=2, max_size=3)
+        queue.put_text({'type': 'audio_format'})
+        for i in range(4):
+            queue.put_text({'text': str(i)}, coalesce_key=('translation', i))
+            queue.put_audio(bytes([i]))
+        queue.put_text({'type': 'meeting_ended'})
+
+        payloads = [item[2] for item in queue.items]
+        self.assertEqual(payloads[0], {'type': 'audio_format'})
+        self.assertEqual(payloads[-1], {'type': 'meeting_ended'})
+        self.assertEqual(len(payloads), 3)
+
+    def test_reporter_logs_aggregate_stats(self):
+        async def run():
+            queue = self.make_queue()
+            with self.assertLogs('translation_service.outbound', 'INFO') as logs:
+                queue.start()
+                queue.put_text({'text': 'hi'})
+                await asyncio.sleep(0.03)
+            await queue.close()
+            return logs.output
+
+        with override_settings(OUTBOUND_QUEUE={'REPORT_INTERVAL': 0.01}):
+            output = asyncio.run(run())
+        self.assertIn('connections=', output[0])
+        self.assertIn('dropped_audio=', output[0])
+
+    def test_writer_drains_in_order_and_reports_stats(self):
+        async def run():
+            queue = self.make_queue()
+            queue.start()
+            queue.put_text({'text': 'hi'})
+            queue.put_audio(b'raw')
+            future = asyncio.get_running_loop().create_future()
+            queue.put_audio(future)
+            future.set_result(b'encoded')
+            await asyncio.sleep(0.01)
+            stats = queue.stats()
+            totals = outbound.stats()
+            await queue.close()
+            return stats, totals
+
+        stats, totals = asyncio.run(run())
+        self.assertEqual(self.sent, ['{"text": "hi"}', b'raw', b'encoded'])
+        self.assertEqual(stats, {'depth': 0, 'sent': 3, 'dropped_audio': 0,
+                                 'dropped_text': 0, 'coalesced': 0})
+        self.assertGreaterEqual(totals['sent'], 3)
+
+    def test_send_failure_closes_queue(self):
+        async def run():
+            async def send(text_data=None, bytes_data=None):
+                raise ConnectionError('socket fechado')
+
+            queue = OutboundQueue(send, high_water=4, max_size=8)
+            queue.start()
+            queue.put_text({'text': 'a'})
+            queue.put_text({'text': 'b'})
+            with self.assertLogs('translation_service.outbound', 'ERROR'):
+                await asyncio.sleep(0.01)
+            queue.put_text({'text': 'c'})
+            return queue
+
+        queue = asyncio.run(run())
+        self.assertTrue(queue.closed)
+        self.assertTrue(queue.writer.done())
+        self.assertEqual(queue.stats()['depth'], 0)
+        self.assertEqual(queue.stats()['dropped_text'], 2)
+
+
+class FakeRedis:
+    """
+    Subconjunto de redis.Redis usado pelo RedisBlobStore, com expiração.
+    """
+
+    def __init__(self):
+        self.data = {}
+
+    def _alive(self, key):
+        entry = self.data.get(key)
+        if entry is not None and entry[1] <= time.monotonic():
+            del self.data[key]
+            entry = None
+        return entry
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and self._alive(key):
+            return None
+        self.data[key] = (value, time.monotonic() + ex)
+        return True
+
+    def expire(self, key, seconds):
+        entry = self._alive(key)
+        if entry:
+            self.data[key] = (entry[0], time.monotonic() + seconds)
+        return bool(entry)
+
+    def get(self, key):
+        entry = self._alive(key)
+        return entry[0] if entry else None
+
+
+class BlobStoreTests(SimpleTestCase):
+    def setUp(self):
+        self.location = tempfile.TemporaryDirectory()
+        self.addCleanup(self.location.cleanup)
+
+    def redis_store(self, ttl):
+        # Sem servidor Redis nos testes: o cliente é substituído por um fake
+        store = RedisBlobStore.__new__(RedisBlobStore)
+        store.client = FakeRedis()
+        store.ttl = ttl
+        return store
+
+    def test_filesystem_round_trip(self):
+        store = FileSystemBlobStore(self.location.name, ttl=60)
+        key = store.put(b'audio')
+        self.assertEqual(store.put(b'audio'), key)
+        self.assertEqual(store.get(key), b'audio')
+        self.assertEqual(store.get(store.put(b'')), b'')
+
+    def test_filesystem_evicts_after_ttl(self):
+        store = FileSystemBlobStore(self.location.name, ttl=60)
+        key = store.put(b'audio')
+        past = time.time() - 120
+        os.utime(store._path(key), (past, past))
+        store.evict_expired()
+        with self.assertRaises(BlobNotFound):
+            store.get(key)
+
+    def test_redis_round_trip(self):
+        store = self.redis_store(ttl=60)
+        key = store.put(b'audio')
+        self.assertEqual(store.put(b'audio'), key)
+        self.assertEqual(store.get(key), b'audio')
+
+    def test_redis_expires_after_ttl(self):
+        store = self.redis_store(ttl=0.01)
+        key = store.put(b'audio')
+        time.sleep(0.02)
+        with self.assertRaises(BlobNotFound):
+            store.get(key)
+
+    def test_cache_entries_expire_with_store_ttl(self):
+        store = FileSystemBlobStore(self.location.name, ttl=60)
+        blob_cache = BlobCache(store, max_bytes=1024, ttl=0.05)
+
+        async def run():
+            key = await blob_cache.put(b'audio')
+            os.remove(store._path(key))
+            # Ainda em cache local dentro do TTL
+            self.assertEqual(await blob_cache.get(key), b'audio')
+            await asyncio.sleep(0.06)
+            with self.assertRaises(BlobNotFound):
+                await blob_cache.get(key)
+            self.assertEqual(blob_cache.size, 0)
+
+        asyncio.run(run())
+
+    def test_concurrent_gets_fetch_once(self):
+        store = FileSystemBlobStore(self.location.name, ttl=60)
+        key = store.put(b'audio')
+        calls = []
+        release = threading.Event()
+        original_get = store.get
+
+        def slow_get(key):
+            calls.append(key)
+            release.wait(1)
+            return original_get(key)
+
+        store.get = slow_get
+        blob_cache = BlobCache(store, max_bytes=1024)
+
+        async def run():
+            tasks = [asyncio.ensure_future(blob_cache.get(key)) for _ in range(10)]
+            await asyncio.sleep(0.01)
+            release.set()
+            return await asyncio.gather(*tasks)
+
+        self.assertEqual(asyncio.run(run()), [b'audio'] * 10)
+        self.assertEqual(calls, [key])
+        self.assertEqual(asyncio.run(blob_cache.get(key)), b'audio')
+        self.assertEqual(calls, [key])
+
+
+class ConsumerAdmissionTests(TestCase):
+    def setUp(self):
+        tenant = Tenant.objects.create(name='Acme', subdomain='acme', max_meetings=0)
+        user = User.objects.create(username='host', tenant=tenant)
+        self.meeting = Meeting.objects.create(tenant=tenant, creator=user, name='Daily')
+
+    async def test_rejected_connection_disconnects_cleanly(self):
+        tenant_scheduler = TenantScheduler({
+            'SYNC_INTERVAL': 60,
+            'PROVIDERS': {'speech': {'rate': 1, 'burst': 1, 'concurrency': 1}},
+        })
+        consumer = streaming.TranslationConsumer()
+        consumer.scope = {
+            'url_route': {'kwargs': {'meeting_id': self.meeting.id}},
+            'user': AnonymousUser(),
+        }
+        consumer.channel_name = 'test'
+        consumer.channel_layer = mock.AsyncMock()
+        consumer.close = mock.AsyncMock()
+
+        with mock.patch.object(streaming, 'get_scheduler', return_value=tenant_scheduler), \
+                mock.patch.object(tenant_scheduler, 'release') as release:
+            await consumer.connect()
+            consumer.close.assert_awaited_once_with(code=4029)
+            await consumer.disconnect(4029)
+
+        release.assert_not_called()
+        consumer.channel_layer.group_discard.assert_not_called()
+        tenant_scheduler._sync_task.cancel()
+
+
+def fake_frame(qualname, **f_locals):
+    return SimpleNamespace(
+        f_code=SimpleNamespace(co_qualname=qualname, co_name=qualname.rsplit('.', 1)[-1]),
+        f_locals=f_locals,
+    )
+
+
+class SamplingProfilerTests(SimpleTestCase):
+    def setUp(self):
+        self.output = tempfile.TemporaryDirectory()
+        self.addCleanup(self.output.cleanup)
+        self.settings_override = override_settings(
+            PROFILER={'OUTPUT_DIR': self.output.name, 'MAX_DURATION': 5}
+        )
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        self.addCleanup(setattr, profiler, '_active', None)
+
+    def test_tags_from_consumer_frames(self):
+        consumer = SimpleNamespace(meeting_id=7)
+        # Do frame mais interno para o mais externo
+        frames = [
+            fake_frame('SpeechClient.recognize'),
+            fake_frame('TranslationConsumer.transcribe_audio.<locals>.<lambda>', self=consumer),
+            fake_frame('_WorkItem.run'),
+        ]
+        self.assertEqual(profiler._tags(frames), ('meeting_7', 'transcribe_audio'))
+        self.assertEqual(
+            profiler._tags([fake_frame('TranslationConsumer.process_audio', self=consumer)]),
+            ('meeting_7', 'process_audio'),
+        )
+        self.assertEqual(profiler._tags([fake_frame('BaseEventLoop.run_forever')]), ('untagged', 'other'))
+
+    def test_lag_summary(self):
+        session = profiler.SamplingProfiler(1)
+        self.assertEqual(session._lag_summary(), {})
+        session.lags = [i / 1000 for i in range(1, 101)]
+        summary = session._lag_summary()
+        self.assertEqual(summary['samples'], 100)
+        self.assertAlmostEqual(summary['p50_ms'], 51)
+        self.assertAlmostEqual(summary['p99_ms'], 100)
+        self.assertAlmostEqual(summary['max_ms'], 100)
+        self.assertAlmostEqual(summary['mean_ms'], 50.5)
+
+    def test_duration_is_capped(self):
+        self.assertEqual(profiler.SamplingProfiler(60).duration, 5)
+
+    def test_session_writes_collapsed_stacks(self):
+        async def run():
+            session = profiler.start_profiling(0.05, 0.005, meeting_id=7)
+            self.assertIsNone(profiler.start_profiling(0.05, 0.005, meeting_id=7))
+            await session.lag_task
+            return session
+
+        session = asyncio.run(run())
+        self.assertTrue(session.stopped.is_set())
+        self.assertGreater(session.samples, 0)
+
+        names = sorted(os.listdir(self.output.name))
+        self.assertEqual([os.path.splitext(name)[1] for name in names], ['.collapsed', '.json'])
+        with open(os.path.join(self.output.name, names[0])) as f:
+            lines = f.read().splitlines()
+        self.assertTrue(lines)
+        for line in lines:
+            stack, count = line.rsplit(' ', 1)
+            frames = stack.split(';')
+            self.assertGreater(int(count), 0)
+            self.assertIn(frames[0], ('untagged', 'meeting_7'))
+            self.assertTrue(frames[2].startswith('thread '))
+
+        # Sessão encerrada: uma nova pode começar
+        async def restart():
+            session = profiler.start_profiling(0.01, 0.005)
+            await session.lag_task
+            return session
+
+        self.assertIsNotNone(asyncio.run(restart()))
+
+
+class ProfileMeetingCommandTests(TestCase):
+    def setUp(self):
+        tenant = Tenant.objects.create(name='Acme', subdomain='acme')
+        user = User.objects.create(username='host', tenant=tenant)
+        self.meeting = Meeting.objects.create(tenant=tenant, creator=user, name='Daily')
+        patcher = mock.patch('translation_service.management.commands.profile_meeting.get_channel_layer')
+        self.channel_layer = patcher.start().return_value
+        self.channel_layer.group_send = mock.AsyncMock()
+        self.addCleanup(patcher.stop)
+
+    def profile(self, *args):
+        call_command('profile_meeting', str(self.meeting.id), *args, stdout=StringIO())
+
+    @override_settings(PROFILER={'MAX_DURATION': 60})
+    def test_rejects_duration_above_max(self):
+        with self.assertRaises(CommandError):
+            self.profile('--duration', '61')
+        self.channel_layer.group_send.assert_not_called()
+
+    def test_rejects_interval_below_minimum(self):
+        with self.assertRaises(CommandError):
+            self.profile('--interval', '0.0005')
+        self.channel_layer.group_send.assert_not_called()
+
+    def test_rejects_inactive_meeting(self):
+        Meeting.objects.filter(id=self.meeting.id).update(is_active=False)
+        with self.assertRaises(CommandError):
+            self.profile()
+
+    def test_sends_profiler_start_to_meeting_group(self):
+        self.profile('--duration', '10', '--interval', '0.01')
+        self.channel_layer.group_send.assert_awaited_once_with(
+            f'meeting_{self.meeting.id}',
+            {'type': 'profiler_start', 'meeting_id': self.meeting.id, 'duration': 10.0, 'interval': 0.01},
+        )
@@ -1,10 +1,18 @@
 # translation_service/text_to_speech.py
-import boto3
 import io
 
 class TextToSpeechService:
     def __init__(self, region_name=None):
-        self.client = boto3.client('polly', region_name=region_name)
+        self.region_name = region_name
+        self._client = None
+    
+    @property
+    def client(self):
+        # boto3 importado só no primeiro uso (import lento)
+        if self._client is None:
+            import boto3
+            self._client = boto3.client('polly', region_name=self.region_name)
+        return self._client
     
     def synthesize_speech(self, text, language_code='en-US', voice_id=None, output_format='mp3', streaming=True):
         """
@@ -40,7 +48,8 @@ class TextToSpeechService:
             Text=text,
             OutputFormat=output_format,
             VoiceId=voice_id,
-            Engine='neural'  # Usar modelo neural para melhor qualidade
+            Engine='neural',  # Usar modelo neural para melhor qualidade
+            **self._sample_rate_args(output_format)
         )
         
         return response['AudioStream'].read()
@@ -50,12 +59,17 @@ class TextToSpeechService:
             Text=text,
             OutputFormat=output_format,
             VoiceId=voice_id,
-            Engine='neural'
+            Engine='neural',
+            **self._sample_rate_args(output_format)
         )
         
         # Para streaming, retornamos o stream diretamente
         return response['AudioStream']
     
+    def _sample_rate_args(self, output_format):
+        # PCM sai sempre a 16 kHz, o formato canônico da transcodificação
+        return {'SampleRate': '16000'} if output_format == 'pcm' else {}
+    
     def _get_voice_for_language(self, language_code):
         """
         Mapeia o código de idioma para uma voz neural do Polly.
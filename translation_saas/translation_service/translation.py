@@ -1,9 +1,16 @@
 # translation_service/translation.py
-from google.cloud import translate_v2 as translate
 
 class TranslationService:
     def __init__(self):
-        self.client = translate.Client()
+        self._client = None
+    
+    @property
+    def client(self):
+        # SDK do Google importado só no primeiro uso (import lento)
+        if self._client is None:
+            from google.cloud import translate_v2 as translate
+            self._client = translate.Client()
+        return self._client
     
     def translate_text(self, text, target_language, source_language=None):
         """